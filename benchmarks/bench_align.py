@@ -0,0 +1,81 @@
+'''
+정렬 단계 비교 벤치마크
+합성 RD3 데이터(기본 2만 트레이스)를 만들어
+alignSignal → alignGround → alignChannel 체인과 align_volume(float32, int16)의
+실행 시간과 최대 메모리 사용량(tracemalloc)을 비교함
+
+실행: python benchmarks/bench_align.py --traces 20000
+'''
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from rd3lib import detect_ground, alignSignal, alignGround, alignChannel, align_volume  # noqa: E402
+
+
+def synthetic_volume(traces, ch=25, samples=256, seed=0):
+    # 채널마다 지표면 위치가 조금씩 다른 반사파 + 잡음
+    rng = np.random.default_rng(seed)
+    depth = np.arange(samples)
+    ground = 20 + np.arange(ch) % 5
+    wavelet = (-3000 * np.exp(-((depth - ground[:, None]) / 3.0) ** 2)
+               + 3500 * np.exp(-((depth - ground[:, None] - 6) / 3.0) ** 2))
+    volume = np.empty((ch, samples, traces), dtype=np.int16)
+    for c in range(ch):
+        volume[c] = (wavelet[c][:, None] + rng.normal(0, 300, size=(samples, traces))).astype(np.int16)
+    return volume
+
+
+def chain(volume, ch, ch_offsets, distance_interval):
+    detection = detect_ground(volume, ch)
+    rd3 = alignSignal(volume, ch, detection=detection)
+    rd3 = alignGround(rd3, ch, detection=detection)
+    return alignChannel(rd3, ch_offsets, distance_interval)
+
+
+def measure(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="정렬 단계 비교 벤치마크")
+    parser.add_argument('--traces', type=int, default=20000, help='합성 트레이스 수')
+    args = parser.parse_args()
+
+    ch = 25
+    ch_offsets = [2.58] * 5 + [0.044] * (ch - 10) + [2.58] * 5
+    distance_interval = 0.07274
+    volume = synthetic_volume(args.traces, ch)
+    mb = volume.nbytes / 1e6
+    print(f"합성 데이터: {args.traces} 트레이스, int16 {mb:.0f} MB")
+
+    cases = [
+        ("chain (이전 구현)", lambda: chain(volume, ch, ch_offsets, distance_interval)),
+        ("align_volume float32", lambda: align_volume(volume, ch, ch_offsets, distance_interval, dtype=np.float32)),
+        ("align_volume int16", lambda: align_volume(volume, ch, ch_offsets, distance_interval, dtype=np.int16)),
+    ]
+    results = {}
+    for name, fn in cases:
+        elapsed, peak, result = measure(fn)
+        results[name] = result
+        print(f"{name:<22} {elapsed * 1e3:9.1f} ms  최대 메모리 {peak / 1e6:7.0f} MB ({peak / volume.nbytes:4.1f}x)"
+              f"  결과 {result.dtype} {result.nbytes / 1e6:6.0f} MB")
+
+    reference = results["chain (이전 구현)"]
+    assert np.array_equal(results["align_volume float32"], reference.astype(np.float32))
+    assert np.abs(results["align_volume int16"] - reference).max() <= 0.5
+
+
+if __name__ == '__main__':
+    main()
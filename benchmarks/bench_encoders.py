@@ -0,0 +1,71 @@
+'''
+이미지 인코더 벤치마크
+200 m 구간(기본 2750 트레이스) 합성 데이터의 세 슬라이스 이미지와 도로면 이미지를
+rd3lib.encoders의 프리셋마다 저장하여 이미지별 인코딩 시간과 파일 크기를 비교함
+zip으로 묶을 때 DEFLATE로 다시 압축했을 때 줄어드는 크기와 시간도 함께 보여줌
+
+실행: python benchmarks/bench_encoders.py --traces 2750 --repeat 3
+'''
+import argparse
+import io
+import os
+import sys
+import time
+import zipfile
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from rd3lib.encoders import ENCODERS  # noqa: E402
+from rd3lib.io import figure_pixels  # noqa: E402
+from rd3lib.utils import render_slice  # noqa: E402
+
+
+def encode(encoder, image):
+    buffer = io.BytesIO()
+    encoder.save(image, buffer)
+    return buffer.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="이미지 인코더 벤치마크")
+    parser.add_argument('--traces', type=int, default=2750, help='구간 트레이스 수 (200 m ≈ 2750)')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--encoders', nargs='+', default=list(ENCODERS), help='비교할 프리셋')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    volume = rng.normal(0, 2000, size=(25, 256, args.traces)).astype(np.int16)
+    images = {
+        "종단면": render_slice(volume[12, :, :], figure_pixels((20.0, 5.0))),
+        "평단면": render_slice(volume[:, 30, :], figure_pixels((20.0, 3.0))),
+        "횡단면": render_slice(volume[:, :, min(100, args.traces - 1)].T, figure_pixels((3.0, 8.0))),
+        "도로면": Image.fromarray(rng.integers(60, 120, size=(80, args.traces, 3), dtype=np.uint8)),
+    }
+
+    print(f"{'프리셋':<10} {'이미지':<6} {'시간(ms)':>9} {'크기(KB)':>10} {'DEFLATE 재압축(KB)':>18} {'재압축(ms)':>10}")
+    for name in args.encoders:
+        encoder = ENCODERS[name]
+        total_time, total_bytes = 0.0, 0
+        for label, image in images.items():
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                data = encode(encoder, image)
+            elapsed = (time.perf_counter() - start) / args.repeat
+
+            start = time.perf_counter()
+            with zipfile.ZipFile(io.BytesIO(), 'w', zipfile.ZIP_DEFLATED) as archive:
+                archive.writestr(f"{label}.{encoder.extension}", data)
+                deflated = archive.infolist()[0].compress_size
+            deflate_time = time.perf_counter() - start
+
+            total_time += elapsed
+            total_bytes += len(data)
+            print(f"{name:<10} {label:<6} {elapsed * 1000:9.1f} {len(data) / 1024:10.1f} "
+                  f"{deflated / 1024:18.1f} {deflate_time * 1000:10.1f}")
+        print(f"{name:<10} {'합계':<6} {total_time * 1000:9.1f} {total_bytes / 1024:10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+'''
+전체 슬라이스 내보내기 벤치마크
+합성 데이터(길이 지정)에 대해 export_slices를 layout/encoder 조합마다 실행하여
+슬라이스 수, 실행 시간, 초당 슬라이스 수, 저장 크기를 비교함
+비교 기준으로 슬라이스마다 normalize_minmax → Image.resize → 저장하는 순차 처리도 첫 구간에 대해 측정함
+
+실행: python benchmarks/bench_export.py --length 400 --sizes figure
+'''
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from rd3lib.export import FIGURE_SIZES, cross_section_traces, export_slices  # noqa: E402
+from rd3lib.utils import chunk_range, normalize_minmax  # noqa: E402
+
+DISTANCE_INTERVAL = 0.072740
+
+
+def directory_size(path):
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(path) for name in names)
+
+
+def per_slice(volume, chunk, cross, sizes, savepath):
+    # 슬라이스마다 따로 정규화하고 크기를 바꿔 저장 (비교 기준)
+    start, end = chunk
+    os.makedirs(savepath, exist_ok=True)
+    slices = [('종단면', c, lambda c: volume[c, :, start:end]) for c in range(volume.shape[0])]
+    slices += [('평단면', d, lambda d: volume[:, d, start:end]) for d in range(volume.shape[1])]
+    slices += [('횡단면', t, lambda t: volume[:, :, t].T) for t in cross[(cross >= start) & (cross <= end)]]
+    for axis, label, slicer in slices:
+        image = Image.fromarray(np.ascontiguousarray(normalize_minmax(slicer(label))))
+        if axis in sizes:
+            image = image.resize(sizes[axis], resample=Image.LANCZOS)
+        image.save(os.path.join(savepath, f"{axis}_{label}.png"), format='PNG')
+    return len(slices)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="전체 슬라이스 내보내기 벤치마크")
+    parser.add_argument('--length', type=float, default=400, help='측선 길이(m)')
+    parser.add_argument('--spacing', type=float, default=1.0, help='횡단면 간격(m)')
+    parser.add_argument('--sizes', choices=['native', 'figure'], default='native',
+                        help='native: 원본 크기, figure: image_save와 같은 크기')
+    parser.add_argument('--encoders', nargs='+', default=['png', 'fast'])
+    parser.add_argument('--workers', type=int, default=None, help='인코딩 스레드 수')
+    args = parser.parse_args()
+
+    traces = int(round(args.length / DISTANCE_INTERVAL))
+    volume = np.random.default_rng(0).normal(0, 2000, size=(25, 256, traces)).astype(np.int16)
+    chunk_list = chunk_range(traces, DISTANCE_INTERVAL)
+    sizes = FIGURE_SIZES if args.sizes == 'figure' else {}
+    cross = cross_section_traces(traces, DISTANCE_INTERVAL, args.spacing)
+    print(f"{args.length:g} m ({traces} 트레이스, {len(chunk_list)}개 구간), 크기: {args.sizes}, CPU {os.cpu_count()}개")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        count = per_slice(volume, chunk_list[0], cross, sizes, os.path.join(tmp, "baseline"))
+        elapsed = time.perf_counter() - start
+        print(f"  {'슬라이스별 처리 (첫 구간)':<26} {count:7d}장 {elapsed:8.2f} s {count / elapsed:9.1f} 장/s")
+
+        for layout in ('sequence', 'atlas'):
+            for encoder in args.encoders:
+                savepath = os.path.join(tmp, f"{layout}_{encoder}")
+                start = time.perf_counter()
+                index = export_slices(volume, "bench.rd3", chunk_list, DISTANCE_INTERVAL, savepath=savepath,
+                                      layout=layout, spacing_m=args.spacing, sizes=sizes, encoder=encoder,
+                                      workers=args.workers)
+                elapsed = time.perf_counter() - start
+                count = sum(len(entry['indices']) for entry in index)
+                print(f"  {'export_slices ' + layout + '/' + encoder:<26} {count:7d}장 {elapsed:8.2f} s "
+                      f"{count / elapsed:9.1f} 장/s {directory_size(savepath) / 1e6:9.1f} MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+'''
+필터 실행 메모리 벤치마크
+합성 정렬 결과(float32, 기본 2만 트레이스)에 필터 그룹을 적용할 때
+필터마다 새 배열을 만드는 이전 방식(복사 → 필터별 새 배열 → int32 변환)과
+FilterPlan의 작업 버퍼 방식(int16 결과, overwrite_input)의 실행 시간과 최대 메모리 사용량(tracemalloc)을 비교함
+
+실행: python benchmarks/bench_filter_memory.py --traces 20000 --groups "[2]DEFAULT" "[1]isung_view"
+'''
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from rd3lib.filter import load_filter_plan  # noqa: E402
+
+
+def copying(plan, data):
+    # 이전 FilterPlan 실행 방식 (비교 기준)
+    RD3_data = np.array(data)
+    for step in plan:
+        stats = None
+        if step.fit is not None:
+            stats = step.fit([data if step.fit_source else RD3_data])
+        RD3_data = step(RD3_data, stats)
+    return np.int32(RD3_data)
+
+
+def measure(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="필터 실행 메모리 벤치마크")
+    parser.add_argument('--traces', type=int, default=20000, help='합성 트레이스 수')
+    parser.add_argument('--groups', nargs='+', default=['[2]DEFAULT', '[1]isung_view', '[3]DIFF'])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    aligned = rng.normal(0, 2000, size=(25, 256, args.traces)).astype(np.float32)
+    mb = aligned.nbytes / 2 / 1e6
+    print(f"합성 데이터: {args.traces} 트레이스, int16 기준 {mb:.0f} MB")
+
+    for group in args.groups:
+        plan = load_filter_plan(group)
+        print(f"{group}: {' → '.join(step.base for step in plan)}")
+        elapsed, peak, reference = measure(lambda: copying(plan, aligned))
+        print(f"  이전 방식 (int32)          {elapsed:7.2f} s  최대 메모리 {peak / 1e6:7.0f} MB ({peak / 1e6 / mb:4.1f}x)")
+
+        work = aligned.copy()
+        elapsed, peak, result = measure(lambda: plan(work, overwrite_input=True))
+        print(f"  작업 버퍼 (int16)          {elapsed:7.2f} s  최대 메모리 {peak / 1e6:7.0f} MB ({peak / 1e6 / mb:4.1f}x)")
+        assert np.array_equal(result, reference)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+'''
+칼만 필터 벤치마크
+합성 측선(기본 2만 트레이스) 전체에 대해 axis=1(깊이), axis=2(거리) 칼만 필터를
+이전 float64 구현과 float32 구현(스레드 수별)으로 비교함
+
+실행: python benchmarks/bench_kalman.py --traces 20000 --workers 1 4
+'''
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from rd3lib.filter_back_end import kalman_filter  # noqa: E402
+
+
+def kalman_loop(data, axis, percentvar, gain):
+    # 이전 kalman_filter.run 구현 (비교 기준, np.int → np.int64)
+    dimension = list(data.shape)
+    dimension.pop(axis)
+    new_data = data.copy().astype(np.int64)
+
+    noisevar = np.zeros(dimension)
+    noisevar[:, :] = percentvar
+    slicing = [0 if i == axis else slice(0, None, 1) for i in range(data.ndim)]
+    predicted = data[tuple(slicing)]
+    predictedvar = noisevar
+
+    for i in range(0, data.shape[axis] - 1):
+        slicing = [i + 1 if j == axis else slice(0, None, 1) for j in range(data.ndim)]
+        observed = data[tuple(slicing)]
+        Kalman = predictedvar / (predictedvar + noisevar)
+        corrected = gain * predicted + (1.0 - gain) * observed + Kalman * (observed - predicted)
+        predictedvar = predictedvar * (1.0 - Kalman)
+        predicted = corrected
+        new_data[tuple(slicing)] = corrected.astype(np.int64)
+
+    return np.int16(new_data)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="칼만 필터 벤치마크")
+    parser.add_argument('--traces', type=int, default=20000, help='합성 트레이스 수')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, os.cpu_count() or 1], help='비교할 스레드 수')
+    parser.add_argument('--percentvar', type=float, default=0.05)
+    parser.add_argument('--gain', type=float, default=0.55)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    volume = rng.normal(0, 2000, size=(25, 256, args.traces)).astype(np.int16)
+    print(f"합성 데이터: {args.traces} 트레이스, {volume.nbytes / 1e6:.0f} MB")
+
+    for axis in (1, 2):
+        start = time.perf_counter()
+        reference = kalman_loop(volume, axis, args.percentvar, args.gain)
+        print(f"axis={axis}  이전 구현 (float64)      {time.perf_counter() - start:8.2f} s")
+
+        for workers in dict.fromkeys(args.workers):
+            kalman = kalman_filter(axis=axis, percentvar=args.percentvar, gain=args.gain, workers=workers)
+            start = time.perf_counter()
+            result = kalman.run(volume)
+            elapsed = time.perf_counter() - start
+            diff = np.abs(result.astype(np.int32) - reference)
+            print(f"axis={axis}  float32 workers={workers:<3}     {elapsed:8.2f} s"
+                  f"  최대 차이 {diff.max()}  차이 비율 {np.mean(diff != 0):.2e}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+'''
+int16 → uint8 정규화 벤치마크
+합성 볼륨(기본 2만 트레이스) 전체를 이전 실수 계산(clip → 빼기 → 나누기 → 곱하기)과
+65,536칸 변환표(np.take) 방식으로 정규화하여 실행 시간과 최대 메모리 사용량(tracemalloc)을 비교함
+(colormap을 적용한 RGB 변환 포함)
+
+실행: python benchmarks/bench_normalize.py --traces 20000 --colormap viridis
+'''
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from rd3lib.utils import colormap_table, normalize_minmax  # noqa: E402
+
+
+def normalize_float(data, vmin=-3000, vmax=3000):
+    # 이전 normalize_minmax 구현 (비교 기준)
+    data_clipped = np.clip(data, vmin, vmax)
+    norm = ((data_clipped - vmin) / (vmax - vmin)) * 255
+    return norm.astype(np.uint8)
+
+
+def measure(fn):
+    fn()  # 변환표 캐시 준비
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="int16 → uint8 정규화 벤치마크")
+    parser.add_argument('--traces', type=int, default=20000, help='합성 트레이스 수')
+    parser.add_argument('--colormap', default='gray', help='RGB 변환에 사용할 colormap')
+    args = parser.parse_args()
+
+    volume = np.random.default_rng(0).normal(0, 2000, size=(25, 256, args.traces)).astype(np.int16)
+    mb = volume.nbytes / 1e6
+    print(f"합성 볼륨: {volume.shape}, {mb:.0f} MB")
+
+    cases = [
+        ("실수 계산", lambda: normalize_float(volume)),
+        ("변환표", lambda: normalize_minmax(volume)),
+        (f"실수 계산 + {args.colormap}", lambda: colormap_table(args.colormap)[normalize_float(volume)]),
+        (f"변환표 RGB ({args.colormap})", lambda: normalize_minmax(volume, colormap=args.colormap)),
+    ]
+    results = []
+    for label, fn in cases:
+        elapsed, peak, result = measure(fn)
+        results.append(result)
+        print(f"  {label:<24} {elapsed:7.3f} s  {mb / elapsed:8.0f} MB/s  최대 메모리 {peak / 1e6:8.0f} MB")
+    print(f"  결과 일치: 밝기 {np.array_equal(results[0], results[1])}, RGB {np.array_equal(results[2], results[3])}")
+
+
+if __name__ == '__main__':
+    main()
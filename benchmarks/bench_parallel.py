@@ -0,0 +1,44 @@
+'''
+채널 병렬 필터 벤치마크
+합성 정렬 결과(float32, 기본 2만 트레이스)에 필터 그룹을 적용하면서
+FilterPlan.speedup_report로 필터마다 1개 스레드와 workers개 스레드의 실행 시간을 비교함
+(full_volume 필터는 채널 방향으로 섞이므로 나누지 않음)
+
+실행: python benchmarks/bench_parallel.py --traces 20000 --workers 32 --groups "[2]DEFAULT" "[3]DIFF"
+'''
+import argparse
+import contextlib
+import io
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from rd3lib.filter import load_filter_plan  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="채널 병렬 필터 벤치마크")
+    parser.add_argument('--traces', type=int, default=20000, help='합성 트레이스 수')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='비교할 스레드 수')
+    parser.add_argument('--groups', nargs='+', default=['[2]DEFAULT', '[1]isung_view', '[3]DIFF'])
+    args = parser.parse_args()
+
+    aligned = np.random.default_rng(0).normal(0, 2000, size=(25, 256, args.traces)).astype(np.float32)
+    print(f"합성 데이터: {args.traces} 트레이스, workers={args.workers} (CPU {os.cpu_count()}개)")
+
+    for group in args.groups:
+        with contextlib.redirect_stdout(io.StringIO()):
+            report = load_filter_plan(group).speedup_report(aligned, args.workers)
+        print(group)
+        for row in report:
+            mark = " (full_volume)" if row['full_volume'] else ""
+            print(f"  {row['name']:<20} {row['serial']:7.3f} s → {row['parallel']:7.3f} s  {row['speedup']:5.2f}x{mark}")
+        serial = sum(row['serial'] for row in report)
+        parallel = sum(row['parallel'] for row in report)
+        print(f"  {'합계':<20} {serial:7.3f} s → {parallel:7.3f} s  {serial / parallel:5.2f}x")
+
+
+if __name__ == '__main__':
+    main()
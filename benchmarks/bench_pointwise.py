@@ -0,0 +1,79 @@
+'''
+점별 필터 합치기 벤치마크
+합성 측선(기본 2만 트레이스)에 gain → range → edge를
+필터별로 하나씩 적용(이전 구현)한 경우와 fused_pointwise로 한 번에 적용한 경우의
+실행 시간과 최대 메모리 사용량(tracemalloc)을 비교함
+
+실행: python benchmarks/bench_pointwise.py --traces 20000
+'''
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+from scipy import special
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from rd3lib.filter_back_end import Gain, Range, edge, fused_pointwise  # noqa: E402
+
+
+def sequential(x, gain, clip, threshold):
+    # 이전 Gain/Range/edge 구현 (비교 기준)
+    x = x.copy()
+    z = np.int16((special.erf((np.arange(x.shape[1]) - gain.inflection_point) / gain.inflection_range) + 1)
+                 * gain.grad_const + gain.y_inter)
+    z = np.vstack(([z] * x.shape[0]))
+    z = np.dstack(([z] * x.shape[2]))
+    x *= z
+    x = np.int16(x)
+    x = np.where(x <= clip.range_vaule, x, clip.range_vaule)
+    x = np.where(x >= -clip.range_vaule, x, -clip.range_vaule)
+    x = np.int16(x)
+    x = np.where(((x >= threshold.edge_range) | (x <= -threshold.edge_range)), x, 0)
+    return np.int16(x)
+
+
+def measure(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="점별 필터 합치기 벤치마크")
+    parser.add_argument('--traces', type=int, default=20000, help='합성 트레이스 수')
+    args = parser.parse_args()
+
+    volume = np.random.default_rng(0).normal(0, 300, size=(25, 256, args.traces)).astype(np.int16)
+    print(f"합성 데이터: {args.traces} 트레이스, int16 {volume.nbytes / 1e6:.0f} MB")
+
+    gain, clip, threshold = Gain(), Range(), edge()
+    gain.y_inter, gain.grad_const = 1.5, 1.0
+    clip.range_vaule = 2000.0
+    threshold.edge_range = 300.0
+
+    cases = [
+        ("필터별 적용 (이전 구현)", lambda: sequential(volume, gain, clip, threshold)),
+        ("필터별 적용", lambda: threshold.edge(clip.Range(gain.Gain(volume.copy())))),
+        ("fused_pointwise", lambda: fused_pointwise(volume, [op.pointwise(volume.shape)
+                                                            for op in (gain, clip, threshold)])),
+    ]
+    reference = None
+    for name, fn in cases:
+        elapsed, peak, result = measure(fn)
+        reference = result if reference is None else reference
+        assert np.array_equal(result, reference)
+        print(f"{name:<24} {elapsed * 1e3:9.1f} ms  최대 메모리 {peak / 1e6:7.0f} MB ({peak / volume.nbytes:4.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+'''
+슬라이스 이미지 렌더링 벤치마크
+200 m 구간(기본 2750 트레이스) 합성 데이터에 대해 image_save의 세 슬라이스를
+이전 matplotlib 경로(업스케일 → imshow → savefig)와 render_slice(PIL 직접 저장)로 만들어
+실행 시간, 이미지 크기, 픽셀 차이를 비교함
+
+실행: python benchmarks/bench_render.py --traces 2750 --repeat 5
+'''
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from rd3lib.io import figure_pixels  # noqa: E402
+from rd3lib.utils import normalize_minmax, render_slice, upscale_image  # noqa: E402
+
+
+def matplotlib_save(slice_data, figsize, path):
+    # 이전 image_save 구현 (비교 기준)
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    norm_img = normalize_minmax(slice_data, vmin=-3000, vmax=3000)
+    upscaled = upscale_image(norm_img, scale=4)
+    fig = plt.figure(figsize=figsize, dpi=100)
+    plt.imshow(upscaled, cmap="gray", aspect='auto')
+    plt.axis('off')
+    fig.savefig(path, bbox_inches='tight', pad_inches=0)
+    plt.close(fig)
+
+
+def pil_save(slice_data, figsize, path):
+    render_slice(slice_data, figure_pixels(figsize)).save(path, format='PNG')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="슬라이스 이미지 렌더링 벤치마크")
+    parser.add_argument('--traces', type=int, default=2750, help='구간 트레이스 수 (200 m ≈ 2750)')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    volume = np.random.default_rng(0).normal(0, 2000, size=(25, 256, args.traces)).astype(np.int16)
+    slices = [
+        ("종단면", volume[12, :, :], (20.0, 5.0)),
+        ("평단면", volume[:, 30, :], (20.0, 3.0)),
+        ("횡단면", volume[:, :, min(100, args.traces - 1)].T, (3.0, 8.0)),
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, data, figsize in slices:
+            row = []
+            for label, save in (("matplotlib", matplotlib_save), ("PIL", pil_save)):
+                path = os.path.join(tmp, f"{label}_{name}.png")
+                start = time.perf_counter()
+                for _ in range(args.repeat):
+                    save(data, figsize, path)
+                row.append(((time.perf_counter() - start) / args.repeat, Image.open(path)))
+            (old_time, old), (new_time, new) = row
+            diff = np.abs(np.asarray(old.convert('L'), dtype=np.int16) - np.asarray(new, dtype=np.int16))
+            print(f"{name}  matplotlib {old_time * 1000:8.1f} ms {old.size}  →  PIL {new_time * 1000:8.1f} ms {new.size}"
+                  f"  {old_time / new_time:5.1f}x  평균 픽셀 차이 {diff.mean():.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+'''
+200 m 구간 이미지 병렬 저장 벤치마크
+합성 데이터(구간 수 x 2750 트레이스)와 도로면 영상에 대해 save_chunk_images를
+프로세스 수별로 실행하여 실행 시간과 속도 향상 비율을 비교하고, 저장한 이미지가 순차 처리와 같은지 확인함
+
+실행: python benchmarks/bench_render_pool.py --chunks 20 --workers 1 2 4
+'''
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from rd3lib.render import SharedArray, save_chunk_images  # noqa: E402
+from rd3lib.utils import chunk_range  # noqa: E402
+
+DISTANCE_INTERVAL = 0.072740
+
+
+def main():
+    parser = argparse.ArgumentParser(description="200 m 구간 이미지 병렬 저장 벤치마크")
+    parser.add_argument('--chunks', type=int, default=20, help='200 m 구간 수 (5 km ≈ 25)')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4], help='비교할 프로세스 수')
+    args = parser.parse_args()
+
+    traces = args.chunks * round(200 / DISTANCE_INTERVAL)
+    rng = np.random.default_rng(0)
+    chunk_list = chunk_range(traces, DISTANCE_INTERVAL)
+    road = Image.fromarray(rng.integers(0, 256, size=(80, traces, 3), dtype=np.uint8))
+
+    with tempfile.TemporaryDirectory() as tmp, SharedArray((25, 256, traces), np.int16) as volume:
+        volume.array[...] = rng.normal(0, 2000, size=volume.array.shape)
+        print(f"{len(chunk_list)}개 구간, {traces} 트레이스, {volume.array.nbytes / 1e6:.0f} MB (CPU {os.cpu_count()}개)")
+
+        baseline, reference = None, None
+        for workers in args.workers:
+            savepath = os.path.join(tmp, str(workers))
+            start = time.perf_counter()
+            paths = save_chunk_images(volume, "bench.rd3", chunk_list, road, savepath=savepath, workers=workers)
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+
+            images = [np.asarray(Image.open(path)) for chunk in paths for path in chunk]
+            same = reference is None or all(np.array_equal(a, b) for a, b in zip(reference, images))
+            reference = reference or images
+            print(f"workers={workers:<3} {elapsed:8.2f} s  {baseline / elapsed:5.2f}x  "
+                  f"{len(images) / elapsed:7.1f} images/s  결과 일치: {same}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+'''
+reshapeRd3 레이아웃 비교 벤치마크
+합성 RD3 데이터(기본 10만 트레이스)를 만들어
+이전 채널별 루프 방식, channel 레이아웃(벡터화 transpose), trace 레이아웃(복사 없음)을 비교함
+
+실행: python benchmarks/bench_reshape.py --traces 100000
+'''
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from rd3lib import reshapeRd3  # noqa: E402
+
+
+def reshape_loop(raw_rd3, ch=25, samples=256):
+    # 이전 reshapeRd3 구현 (비교 기준)
+    trace_count = len(raw_rd3) // (ch * samples)
+    gpr = raw_rd3.reshape(trace_count, ch, samples)
+
+    gpr_reshaped = np.zeros((ch, samples, trace_count), dtype=np.int16)
+    for c in range(ch):
+        gpr_reshaped[c] = gpr[:, c, :].T
+
+    return gpr_reshaped
+
+
+def best_of(fn, repeat):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="reshapeRd3 레이아웃 비교 벤치마크")
+    parser.add_argument('--traces', type=int, default=100000, help='합성 트레이스 수')
+    parser.add_argument('--repeat', type=int, default=3, help='반복 횟수 (최솟값 사용)')
+    args = parser.parse_args()
+
+    ch, samples = 25, 256
+    rng = np.random.default_rng(0)
+    raw_rd3 = rng.integers(-3000, 3000, size=args.traces * ch * samples, dtype=np.int16)
+    mb = raw_rd3.nbytes / 1e6
+    print(f"합성 데이터: {args.traces} 트레이스, {mb:.0f} MB")
+
+    cases = [
+        ("loop (이전 구현)", lambda: reshape_loop(raw_rd3)),
+        ("layout='channel'", lambda: reshapeRd3(raw_rd3)),
+        ("layout='trace'", lambda: reshapeRd3(raw_rd3, layout="trace")),
+    ]
+    results = {}
+    for name, fn in cases:
+        elapsed, volume = best_of(fn, args.repeat)
+        results[name] = volume
+        if np.shares_memory(volume, raw_rd3):
+            print(f"reshape  {name:<18} {elapsed * 1e3:9.1f} ms  {'(뷰, 복사 없음)':>15}")
+        else:
+            print(f"reshape  {name:<18} {elapsed * 1e3:9.1f} ms  {mb / elapsed:9.0f} MB/s  복사 {volume.nbytes / 1e6:6.0f} MB")
+
+    # 후속 단계의 대표 접근 패턴: 트레이스별 깊이 방향 처리 (A-scan 단위)
+    channel_major = results["layout='channel'"]
+    trace_major = results["layout='trace'"]
+    elapsed, a = best_of(lambda: np.abs(np.diff(channel_major, axis=1)).sum(axis=1, dtype=np.int64), args.repeat)
+    print(f"A-scan   layout='channel'   {elapsed * 1e3:9.1f} ms")
+    elapsed, b = best_of(lambda: np.abs(np.diff(trace_major, axis=2)).sum(axis=2, dtype=np.int64), args.repeat)
+    print(f"A-scan   layout='trace'     {elapsed * 1e3:9.1f} ms")
+    assert np.array_equal(a, b.T)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,200 @@
+'''
+rd3lib 합성 데이터 벤치마크 모음
+benchmarks/synthetic.py로 만든 측선(길이별)에 대해 다음 단계의 실행 시간, 처리량(traces/s, MB/s),
+최대 메모리(tracemalloc)를 측정함
+- read, reshape
+- 정렬 단계: detect_ground, channel_fill_means, fuse_align, align_volume
+- filterCollect.csv의 모든 필터 (설정이 같은 필터는 한 번만, 정렬 결과에 각각 적용)
+- 렌더링: 200 m 구간 image_save
+- 전체 파이프라인: image200.run (pipeline/<단계>로 내부 단계도 함께 기록)
+
+--baseline으로 저장된 결과와 비교하여 실행 시간이나 메모리가 tolerance보다 늘어난 단계가 있으면
+종료 코드 1로 끝나므로 배포 전에 성능 저하를 확인할 수 있음
+
+실행: python benchmarks/bench_suite.py --lengths 100 1000 --save-baseline benchmarks/baseline.json
+      python benchmarks/bench_suite.py --lengths 100 1000 --baseline benchmarks/baseline.json
+'''
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import traceback
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from rd3lib import openRd3, readRd3, reshapeRd3, extractionRad, image_save, cut_200m  # noqa: E402
+from rd3lib.filter import compile_step, read_filter_rows  # noqa: E402
+from rd3lib.instrument import job, stage  # noqa: E402
+from rd3lib.processing import align_volume, channel_fill_means, channel_shifts, detect_ground, fuse_align  # noqa: E402
+from rd3lib.utils import chunk_range, rd3_process  # noqa: E402
+import synthetic  # noqa: E402
+
+
+def filter_steps():
+    # filterCollect.csv의 필터 중 설정(FilterStep.key)이 같은 것은 한 번만
+    steps = {}
+    for row in read_filter_rows():
+        step = compile_step(row)
+        if step.dtype is not None:
+            steps.setdefault(step.key, (f"filter.{step.base} {row['filter_group']}/{step.name}", step))
+    return list(steps.values())
+
+
+def run_sections(dirname, basename, traces, workdir):
+    # 측정할 단계들을 실행 (각 단계는 section=True인 최상위 stage로 기록됨)
+    chOffsets, distance_interval, ch = extractionRad(dirname, basename)
+    file_bytes = os.path.getsize(os.path.join(dirname, basename))
+
+    def section(label, fn, data=None, nbytes=None):
+        try:
+            with stage(label, data, nbytes=nbytes, traces=traces, section=True) as s:
+                return s.output(fn())
+        except Exception:
+            traceback.print_exc()
+            return None
+
+    raw = section('read', lambda: readRd3(dirname, basename), nbytes=file_bytes)
+    section('reshape', lambda: reshapeRd3(raw, ch), raw)
+    del raw
+
+    volume = openRd3(dirname, basename)
+    detection = section('align.detect_ground', lambda: detect_ground(volume, ch), volume)
+    shifts = channel_shifts(chOffsets, distance_interval)
+    fill_means = section('align.channel_fill_means', lambda: channel_fill_means(volume, shifts), volume)
+    section('align.fuse_align', lambda: fuse_align(volume, detection, shifts, fill_means), volume)
+    aligned = section('align.align_volume', lambda: align_volume(volume, ch, chOffsets, distance_interval), volume)
+
+    for label, step in filter_steps():
+        def apply(step=step):
+            stats = step.fit([aligned]) if step.fit is not None else None
+            return step(aligned, stats)
+        section(label, apply, aligned)
+    del aligned
+
+    rd3 = rd3_process(dirname, basename)
+    chunk = cut_200m(rd3, chunk_range(rd3.shape[2], distance_interval))[0]
+    section('render', lambda: image_save(chunk, basename, 0, savepath=os.path.join(workdir, 'render')), chunk)
+    del rd3, chunk
+
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        import image200
+        section('pipeline', image200.run, nbytes=file_bytes)
+    finally:
+        os.chdir(cwd)
+
+
+def summarize(report, traces):
+    # 측정한 단계와 pipeline 내부 단계별 결과
+    results = {}
+    for record in report.stages:
+        if record['parent'] is None and record.get('section'):
+            label = record['name']
+        elif record['parent'] == 'pipeline':
+            label = f"pipeline/{record['name']}"
+        else:
+            continue
+        total = results.setdefault(label, dict(wall_s=0.0, cpu_s=0.0, bytes=0, peak_bytes=0, error=None))
+        total['wall_s'] += record['wall_s']
+        total['cpu_s'] += record['cpu_s']
+        total['bytes'] += record['bytes'] or 0
+        total['peak_bytes'] = max(total['peak_bytes'], record['peak_bytes'] or 0)
+        total['error'] = total['error'] or record['error']
+
+    for total in results.values():
+        wall = total['wall_s'] or float('nan')
+        total['traces_per_s'] = traces / wall
+        total['mb_per_s'] = total['bytes'] / 1e6 / wall
+    return results
+
+
+def run_length(length_m, workdir, repeat):
+    dirname = os.path.join(workdir, f"{length_m:g}m")
+    uploads = os.path.join(dirname, 'uploads')
+    if os.path.exists(os.path.join(uploads, 'synthetic.rd3')):
+        traces = synthetic.traces_for_length(length_m)
+    else:
+        _, _, traces = synthetic.write_survey(uploads, length_m)
+
+    best = None
+    for _ in range(repeat):
+        with job(f"{length_m:g}m", memory='tracemalloc') as report:
+            run_sections(uploads, 'synthetic.rd3', traces, dirname)
+        results = summarize(report, traces)
+        if best is None:
+            best = results
+        else:
+            for label, total in results.items():
+                if label in best and total['wall_s'] < best[label]['wall_s']:
+                    best[label] = total
+    return traces, best
+
+
+def compare(results, baseline, tolerance, min_seconds, min_bytes):
+    # (길이, 단계, 항목, 기준값, 현재값) 목록
+    regressions = []
+    for length, stages in results.items():
+        for label, total in stages.items():
+            base = baseline.get(length, {}).get(label)
+            if base is None or total['error'] or base.get('error'):
+                continue
+            if total['wall_s'] > base['wall_s'] * (1 + tolerance) and total['wall_s'] - base['wall_s'] > min_seconds:
+                regressions.append((length, label, 'wall_s', base['wall_s'], total['wall_s']))
+            if total['peak_bytes'] > base['peak_bytes'] * (1 + tolerance) \
+                    and total['peak_bytes'] - base['peak_bytes'] > min_bytes:
+                regressions.append((length, label, 'peak_bytes', base['peak_bytes'], total['peak_bytes']))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="rd3lib 합성 데이터 벤치마크 모음")
+    parser.add_argument('--lengths', type=float, nargs='+', default=[100, 1000], help='측선 길이(m), 100 ~ 10000')
+    parser.add_argument('--repeat', type=int, default=1, help='반복 횟수 (단계별 가장 빠른 결과 사용)')
+    parser.add_argument('--workdir', help='합성 데이터와 결과 이미지 디렉토리 (기본값: 임시 디렉토리, 있으면 재사용)')
+    parser.add_argument('--output', help='결과 JSON 저장 경로')
+    parser.add_argument('--baseline', help='비교할 기준 결과 JSON')
+    parser.add_argument('--save-baseline', help='이번 결과를 기준 결과로 저장할 경로')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='허용하는 증가 비율')
+    parser.add_argument('--min-seconds', type=float, default=0.05, help='이보다 작은 시간 증가는 무시')
+    parser.add_argument('--min-mb', type=float, default=1.0, help='이보다 작은 메모리 증가(MB)는 무시')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = os.path.abspath(args.workdir or tmp)
+        results = {}
+        for length_m in args.lengths:
+            traces, stages = run_length(length_m, workdir, args.repeat)
+            results[f"{length_m:g}m"] = stages
+            print(f"\n{length_m:g} m ({traces} 트레이스)")
+            print(f"  {'단계':<48} {'시간(s)':>9} {'traces/s':>11} {'MB/s':>9} {'최대 메모리(MB)':>15}")
+            for label, total in stages.items():
+                mark = f"  실패: {total['error']}" if total['error'] else ""
+                print(f"  {label:<48} {total['wall_s']:9.3f} {total['traces_per_s']:11.0f} "
+                      f"{total['mb_per_s']:9.1f} {total['peak_bytes'] / 1e6:15.1f}{mark}")
+
+    document = dict(meta=dict(python=platform.python_version(), numpy=np.__version__,
+                              platform=platform.platform(), cpu_count=os.cpu_count()),
+                    results=results)
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(document, f, indent=2, ensure_ascii=False)
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline['results'], args.tolerance, args.min_seconds, args.min_mb * 1e6)
+        print(f"\n기준 결과({args.baseline}) 대비 {args.tolerance:.0%} 이상 늘어난 단계: {len(regressions)}개")
+        for length, label, key, base, value in regressions:
+            print(f"  {length} {label} {key}: {base:.4g} → {value:.4g} ({value / base:.2f}x)")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
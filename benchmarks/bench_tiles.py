@@ -0,0 +1,67 @@
+'''
+Deep Zoom 타일 피라미드 벤치마크
+합성 측선(길이 지정)에 대해 200 m 구간 PNG(save_chunk_images)와 측선 전체 타일 피라미드(save_survey_tiles)의
+저장 시간, 파일 수, 전체 크기, 처음 화면(측선 전체 보기)에 필요한 바이트 수를 비교함
+
+실행: python benchmarks/bench_tiles.py --length 1000
+'''
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from rd3lib.render import save_chunk_images  # noqa: E402
+from rd3lib.tiles import level_sizes, read_dzi, save_survey_tiles  # noqa: E402
+from rd3lib.utils import chunk_range  # noqa: E402
+
+DISTANCE_INTERVAL = 0.072740
+
+
+def directory_size(path):
+    files = [os.path.join(root, name) for root, _, names in os.walk(path) for name in names]
+    return len(files), sum(os.path.getsize(f) for f in files)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Deep Zoom 타일 피라미드 벤치마크")
+    parser.add_argument('--length', type=float, default=1000, help='측선 길이(m)')
+    parser.add_argument('--viewer-width', type=int, default=900, help='뷰어 가로 픽셀 수 (처음 화면 계산용)')
+    args = parser.parse_args()
+
+    traces = int(round(args.length / DISTANCE_INTERVAL))
+    rng = np.random.default_rng(0)
+    volume = rng.normal(0, 2000, size=(25, 256, traces)).astype(np.int16)
+    road = Image.fromarray(rng.integers(0, 256, size=(80, traces, 3), dtype=np.uint8))
+    chunk_list = chunk_range(traces, DISTANCE_INTERVAL)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = {}
+        start = time.perf_counter()
+        save_chunk_images(volume, "bench.rd3", chunk_list, road, savepath=os.path.join(tmp, "images"))
+        results['200 m PNG'] = (time.perf_counter() - start, *directory_size(os.path.join(tmp, "images")))
+
+        start = time.perf_counter()
+        paths = save_survey_tiles(volume, "bench.rd3", road, savepath=os.path.join(tmp, "tiles"))
+        results['타일 피라미드'] = (time.perf_counter() - start, *directory_size(os.path.join(tmp, "tiles")))
+
+        # 측선 전체를 viewer-width 픽셀에 맞춘 단계의 타일 크기 합
+        first_view = 0
+        for view, dzi in paths.items():
+            width, height, _ = read_dzi(dzi)
+            sizes = level_sizes(width, height)
+            level = max(k for k, (w, _) in enumerate(sizes) if w <= args.viewer_width)
+            first_view += directory_size(os.path.join(tmp, "tiles", f"bench_{view}_files", str(level)))[1]
+
+    print(f"{args.length:g} m ({traces} 트레이스, {len(chunk_list)}개 구간)")
+    for label, (elapsed, count, size) in results.items():
+        print(f"  {label:<12} {elapsed:8.2f} s  {count:6d}개 파일  {size / 1e6:8.2f} MB")
+    print(f"  처음 화면: 200 m PNG 전체 {results['200 m PNG'][2] / 1e6:.2f} MB → 타일 {first_view / 1e6:.3f} MB")
+
+
+if __name__ == '__main__':
+    main()
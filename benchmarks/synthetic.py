@@ -0,0 +1,200 @@
+'''
+합성 RD3/RAD/RST 측선 생성기
+25채널 x 256샘플 측선을 지정한 길이(100 m ~ 10 km)로 만듦
+- 지표면 반사파: 채널마다 조금씩 다르고 거리 방향으로 천천히 변하는 위치
+- 매설관 쌍곡선: 약 10 m마다 하나씩, CH_Y_OFFSETS만큼 채널별 위치가 어긋남 (alignChannel 후 맞춰짐)
+- 잡음: 가우시안 잡음 + 깊이별 수평 링잉(background 필터 대상)
+- .rst: 차선이 있는 도로면 영상 (road.roadDrawing이 읽는 트레이스당 1280 x 3 바이트)
+
+파일은 트레이스 블록 단위로 써서 10 km 측선도 블록 크기만큼의 메모리만 사용함
+
+실행: python benchmarks/synthetic.py ./uploads --length 1000
+'''
+import argparse
+import os
+
+import numpy as np
+
+CH = 25
+SAMPLES = 256
+DISTANCE_INTERVAL = 0.072740
+TIME_WINDOW = 52.101120  # ns
+CH_Y_OFFSETS = [2.580] * 5 + [0.044] * 15 + [2.580] * 5
+CH_X_OFFSETS = [round(-1.2 + 0.1 * c, 3) for c in range(CH)]
+RST_HEIGHT = 1280  # road.roadDrawing의 Hsize
+RST_HEADER = 16  # road.roadDrawing은 각 트레이스를 16바이트 뒤에서부터 읽음
+VELOCITY = 0.1  # m/ns
+BLOCK = 4096  # 한 번에 만드는 트레이스 수
+
+RAD_TEMPLATE = """SAMPLES:{samples}
+FREQUENCY:4913.521973
+FREQUENCY STEPS:96
+SIGNAL POSITION:
+RAW SIGNAL POSITION:
+DISTANCE FLAG:1
+TIME FLAG:0
+PROGRAM FLAG:0
+EXTERNAL FLAG:0
+TIME INTERVAL: 0.000000
+DISTANCE INTERVAL: {distance_interval:.6f}
+OPERATOR:
+CUSTOMER:
+SITE: synthetic
+ANTENNAS:400 MHz shielded
+ANTENNA ORIENTATION:NOT VALID FIELD
+ANTENNA SEPARATION: 0.310000
+COMMENT:
+TIMEWINDOW:{time_window:.6f}
+STACKS:2
+STACK EXPONENT:1
+STACKING TIME:0.048000
+LAST TRACE:{traces}
+STOP POSITION:{stop:.6f}
+SYSTEM CALIBRATION:0.0000021200
+START POSITION:0.000000
+SHORT FLAG:1
+INTERMEDIATE FLAG:0
+LONG FLAG:0
+PREPROCESSING:0
+HIGH:0
+LOW:0
+FIXED INCREMENT:0.300000
+FIXED MOVES UP:0
+FIXED MOVES DOWN:1
+FIXED POSITION:0.000000
+WHEEL CALIBRATION:96.2330000000
+POSITIVE DIRECTION:1
+NUMBER_OF_CH:{ch}
+CH_X_OFFSETS:{x_offsets}
+CH_Y_OFFSETS:{y_offsets}
+UNITS:m
+DATE:2024-07-04
+TIME:14:30
+"""
+
+
+def traces_for_length(length_m, distance_interval=DISTANCE_INTERVAL):
+    """ 측선 길이(m)에 해당하는 트레이스 수 """
+    return max(int(round(length_m / distance_interval)), 1)
+
+
+def _ricker(t, frequency=0.08):
+    # t: 샘플 단위 시간차, frequency: 샘플당 주기
+    a = (np.pi * frequency * t) ** 2
+    return (1 - 2 * a) * np.exp(-a)
+
+
+def _pipes(traces, rng, spacing_m=10.0):
+    # 매설관 (중심 트레이스, 꼭짓점 샘플, 진폭)
+    count = max(int(traces * DISTANCE_INTERVAL / spacing_m), 1)
+    centers = np.sort(rng.uniform(0, traces, count))
+    apex = rng.uniform(60, 200, count)
+    amplitude = rng.uniform(1500, 4000, count) * rng.choice([-1, 1], count)
+    return centers, apex, amplitude
+
+
+def gpr_block(start, stop, pipes, rng, noise=300.0):
+    """
+    [start, stop) 트레이스의 합성 GPR 데이터를 (트레이스, 채널, 깊이) int16 배열로 만듭니다.
+    """
+    n = stop - start
+    x = np.arange(start, stop, dtype=np.float32)
+    depth = np.arange(SAMPLES, dtype=np.float32)
+    block = rng.normal(0, noise, size=(n, CH, SAMPLES)).astype(np.float32)
+
+    # 깊이별 수평 링잉 (모든 트레이스에 같은 값)
+    ringing = 400 * np.sin(depth / 3.0) * np.exp(-depth / 80.0)
+    block += ringing
+
+    # 지표면 반사파: 채널마다 다르고 거리 방향으로 천천히 변함
+    period = 200.0 / DISTANCE_INTERVAL
+    samples_per_m = 2 / (VELOCITY * TIME_WINDOW / SAMPLES)
+    shifts = np.round(np.asarray(CH_Y_OFFSETS) / DISTANCE_INTERVAL)
+    centers, apex, amplitude = pipes
+    half = (SAMPLES + 60) / samples_per_m / DISTANCE_INTERVAL  # 쌍곡선이 보이는 최대 트레이스 거리
+    for c in range(CH):
+        ground = 20 + c % 5 + 2 * np.sin(2 * np.pi * (x + shifts[c]) / period)
+        block[:, c] += 4000 * _ricker(depth[None, :] - ground[:, None])
+
+        # 매설관 쌍곡선 (채널 오프셋만큼 어긋난 위치)
+        near = np.nonzero((centers - shifts[c] > start - half) & (centers - shifts[c] < stop + half))[0]
+        for p in near:
+            dx = (x - (centers[p] - shifts[c])) * DISTANCE_INTERVAL
+            t = np.sqrt(apex[p] ** 2 + (dx * samples_per_m) ** 2)
+            visible = t < apex[p] + 60
+            if visible.any():
+                block[visible, c] += amplitude[p] * _ricker(depth[None, :] - t[visible, None]) \
+                    * np.exp(-(t[visible, None] - apex[p]) / 30.0)
+
+    np.clip(block, -32768, 32767, out=block)
+    return block.astype(np.int16)
+
+
+def rst_block(start, stop, rng):
+    """
+    [start, stop) 트레이스의 도로면 영상을 트레이스당 RST_HEIGHT x 3 바이트로 만듭니다.
+    """
+    n = stop - start
+    road = rng.normal(90, 12, size=(n, RST_HEIGHT)).clip(0, 255)
+    dashed = ((np.arange(start, stop) * DISTANCE_INTERVAL) % 10.0) < 6.0
+    for lane in (160, 640, 1120):
+        road[:, lane:lane + 24] = 235
+    road[dashed, 400:416] = 235
+    road[dashed, 880:896] = 235
+    return np.repeat(road.astype(np.uint8)[:, :, None], 3, axis=2)
+
+
+def write_survey(dirname, length_m, name="synthetic", seed=0, noise=300.0):
+    """
+    합성 .rd3/.rad/.rst 파일을 dirname에 만듭니다.
+
+    :param dirname: 저장할 디렉토리
+    :type dirname: str
+    :param length_m: 측선 길이(m)
+    :type length_m: float
+    :param name: 파일 이름 (확장자 제외)
+    :type name: str
+    :param seed: 난수 시드
+    :type seed: int
+    :param noise: 가우시안 잡음 표준편차
+    :type noise: float
+    :return: (DIRNAME, BASENAME, 트레이스 수)
+    :rtype: tuple
+    """
+    os.makedirs(dirname, exist_ok=True)
+    traces = traces_for_length(length_m)
+    rng = np.random.default_rng(seed)
+    pipes = _pipes(traces, rng)
+
+    with open(os.path.join(dirname, f"{name}.rd3"), "wb") as rd3, \
+            open(os.path.join(dirname, f"{name}.rst"), "wb") as rst:
+        rst.write(bytes(RST_HEADER))
+        for start in range(0, traces, BLOCK):
+            stop = min(start + BLOCK, traces)
+            gpr_block(start, stop, pipes, rng, noise).tofile(rd3)
+            rst_block(start, stop, rng).tofile(rst)
+
+    with open(os.path.join(dirname, f"{name}.rad"), "w") as f:
+        f.write(RAD_TEMPLATE.format(
+            samples=SAMPLES, distance_interval=DISTANCE_INTERVAL, time_window=TIME_WINDOW,
+            traces=traces, stop=traces * DISTANCE_INTERVAL, ch=CH,
+            x_offsets=" ".join(f"{v:.3f}" for v in CH_X_OFFSETS),
+            y_offsets=" ".join(f"{v:.3f}" for v in CH_Y_OFFSETS)))
+    return dirname, f"{name}.rd3", traces
+
+
+def main():
+    parser = argparse.ArgumentParser(description="합성 RD3/RAD/RST 측선 생성기")
+    parser.add_argument('dirname', help='저장할 디렉토리')
+    parser.add_argument('--length', type=float, default=1000, help='측선 길이(m)')
+    parser.add_argument('--name', default='synthetic', help='파일 이름 (확장자 제외)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--noise', type=float, default=300.0, help='가우시안 잡음 표준편차')
+    args = parser.parse_args()
+
+    dirname, basename, traces = write_survey(args.dirname, args.length, args.name, args.seed, args.noise)
+    print(f"{os.path.join(dirname, basename)}: {traces} 트레이스 ({args.length:g} m)")
+
+
+if __name__ == '__main__':
+    main()
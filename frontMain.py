@@ -6,6 +6,8 @@ import os
 from datetime import datetime
 from typing import List
 from image200 import run
+from rd3lib.instrument import job, stage
+from rd3lib.encoders import IMAGE_EXTENSIONS, zip_compress_type
 import zipfile
 import urllib.parse
 
@@ -58,12 +60,14 @@ async def upload_files(request: Request, files: List[UploadFile] = File(...)):
             "error": "rd3, rad, rst 파일이 모두 필요합니다."
         })
 
-    run()
-
     zip_filename = "results_" + datetime.now().strftime('%Y%m%d%H%M%S%f') + ".zip"
-    make_result_zip(RESULT_DIR, zip_filename)
+    # 단계별 실행 시간과 메모리 사용량을 zip 파일과 같은 이름의 .json으로 저장
+    with job(zip_filename[:-4]) as report:
+        run()
+        make_result_zip(RESULT_DIR, zip_filename)
+    report.save(os.path.join(RESULT_DIR, zip_filename[:-4] + "_report.json"))
 
-    result_images = [f for f in os.listdir(RESULT_DIR) if f.endswith(".png")]
+    result_images = [f for f in os.listdir(RESULT_DIR) if f.endswith(IMAGE_EXTENSIONS)]
 
     return templates.TemplateResponse("Jinja_front.html", {
         "request": request,
@@ -74,7 +78,7 @@ async def upload_files(request: Request, files: List[UploadFile] = File(...)):
 
 def make_result_zip(result_dir: str, zip_name: str) -> str:
     """
-    result_dir에 있는 모든 .png 파일을 zip으로 묶어서 반환하는 함수
+    result_dir에 있는 모든 이미지 파일을 zip으로 묶어서 반환하는 함수 (이미지는 다시 압축하지 않음)
     :param result_dir: 결과 이미지가 저장된 디렉토리
     :param zip_name: 생성할 zip 파일의 이름
     :return: 생성된 zip 파일의 이름
@@ -83,12 +87,13 @@ def make_result_zip(result_dir: str, zip_name: str) -> str:
     time.sleep(1)
 
     zip_path = os.path.join(result_dir, zip_name)
-    with zipfile.ZipFile(zip_path, 'w') as zipf:
+    with stage('zip', nbytes=0, file=zip_name) as s, zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
         for file in os.listdir(result_dir):
-            if file.endswith(".png"):
-                print("zip  포함: ",file)
+            if file.endswith(IMAGE_EXTENSIONS):
                 file_path = os.path.join(result_dir, file)
-                zipf.write(file_path, arcname=file)  # arcname → zip 안의 이름
+                # arcname → zip 안의 이름
+                zipf.write(file_path, arcname=file, compress_type=zip_compress_type(file))
+                s.nbytes += os.path.getsize(file_path)
     return zip_name
 
 
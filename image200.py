@@ -1,10 +1,33 @@
-from rd3lib import image_save, road_image_save
-from rd3lib import extractionRad, cut_200m
-from rd3lib.utils import rd3_process, chunk_range
+from rd3lib import extractionRad, openRd3
+from rd3lib.utils import rd3_process, rd3_process_presets, chunk_range
+import numpy as np
 import os
 from road import roadDrawing
+from rd3lib.encoders import get_encoder
+from rd3lib.export import export_slices
+from rd3lib.instrument import stage
+from rd3lib.render import SharedArray, save_chunk_images
+from rd3lib.tiles import save_survey_tiles
+
+OUTPUTS = ('images', 'tiles', 'both', 'slices')
+
+
+def run(workers=None, output="images", encoder=None):
+    """
+    uploads 폴더의 .rd3 파일을 처리하여 results 폴더에 이미지를 저장합니다.
+
+    :param workers: 200m 구간 이미지를 저장할 프로세스 수 (save_chunk_images 참고)
+    :type workers: int
+    :param output: 'images'이면 200m 구간마다 PNG, 'tiles'이면 측선 전체 Deep Zoom 타일(results/tiles),
+                   'both'이면 둘 다, 'slices'이면 모든 채널/깊이와 1m 간격 횡단면 이미지(results/slices, export_slices 참고)를 저장
+    :type output: str
+    :param encoder: 이미지 인코더 또는 프리셋 이름 (rd3lib.encoders 참고, 기본값: 'png')
+    :type encoder: str or rd3lib.encoders.ImageEncoder
+    """
+    if output not in OUTPUTS:
+        raise ValueError(f"output은 {OUTPUTS} 중 하나여야 합니다: {output}")
+    encoder = get_encoder(encoder)
 
-def run():
     DIRNAME = None
     BASENAME = None
 
@@ -18,19 +41,48 @@ def run():
     if not DIRNAME or not BASENAME:
         raise FileNotFoundError("'.rd3' 파일을 uploads 폴더에서 찾을 수 없습니다.")
 
-    # 이후 로직 그대로
-    rd3 = rd3_process(DIRNAME, BASENAME)
-    _, distance_interval, _ = extractionRad(DIRNAME, BASENAME)
-    chunk_list = chunk_range(rd3.shape[2], distance_interval)
-    rd3list = cut_200m(rd3, chunk_list)
+    # 전처리 결과를 공유 메모리에 바로 저장하여 렌더링 프로세스들이 복사 없이 읽음 (workers: 렌더링 프로세스 수)
+    with SharedArray(openRd3(DIRNAME, BASENAME).shape, np.int16) as volume:
+        rd3 = rd3_process(DIRNAME, BASENAME, out=volume.array)
+        _, distance_interval, _ = extractionRad(DIRNAME, BASENAME)
+        chunk_list = chunk_range(rd3.shape[2], distance_interval)
 
-    for number in range(len(rd3list)):
-        image_save(rd3list[number], BASENAME, number, depth=30)
+        roaddrawing = roadDrawing(DIRNAME, BASENAME)
+        file_langth = rd3.shape[2]
+        rst_path = os.path.join(DIRNAME, BASENAME[:-4] + '.rst')
+        with stage('rst_decode', nbytes=os.path.getsize(rst_path), file=os.path.basename(rst_path)):
+            img = roaddrawing.makeImg(file_langth)
+        if output == 'slices':
+            export_slices(rd3, BASENAME, chunk_list, distance_interval, savepath=os.path.join("results", "slices"),
+                          encoder=encoder)
+        if output in ('tiles', 'both'):
+            save_survey_tiles(rd3, BASENAME, road_image=img, savepath=os.path.join("results", "tiles"), depth=30,
+                              encoder=encoder)
+        del rd3
+        if output in ('images', 'both'):
+            save_chunk_images(volume, BASENAME, chunk_list, road_image=img, depth=30, savepath="results",
+                              workers=workers, encoder=encoder)
 
-    roaddrawing = roadDrawing(DIRNAME, BASENAME)
-    file_langth = rd3.shape[2]
-    img = roaddrawing.makeImg(file_langth)
-    road_image_save(img, BASENAME, chunk_list)
 
+def run_presets(DIRNAME, BASENAME, groups, savepath="./results", workers=None, encoder=None):
+    """
+    여러 필터 그룹(filter_group)을 한 번에 적용하고 그룹마다 200m 단위 슬라이스 이미지를 저장합니다.
+    그룹들의 앞쪽에 같은 필터가 있으면 한 번만 계산하므로 그룹별 결과를 비교할 때 사용합니다.
 
+    :param workers: 렌더링 프로세스 수 (save_chunk_images 참고)
+    :type workers: int
+    :param encoder: 이미지 인코더 또는 프리셋 이름 (rd3lib.encoders 참고)
+    :type encoder: str or rd3lib.encoders.ImageEncoder
+    :return: {group: (전처리된 배열, 저장한 이미지 경로들)} (이미지는 savepath/group 아래에 저장)
+    :rtype: dict
+    """
+    volumes = rd3_process_presets(DIRNAME, BASENAME, groups)
+    _, distance_interval, _ = extractionRad(DIRNAME, BASENAME)
 
+    outputs = {}
+    for group, rd3 in volumes.items():
+        chunk_list = chunk_range(rd3.shape[2], distance_interval)
+        chunks = save_chunk_images(rd3, BASENAME, chunk_list, depth=30,
+                                   savepath=os.path.join(savepath, str(group)), workers=workers, encoder=encoder)
+        outputs[group] = (rd3, [path for paths in chunks for path in paths])
+    return outputs
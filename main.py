@@ -6,19 +6,34 @@ from fastapi.templating import Jinja2Templates
 import shutil
 import os
 from image200 import run
-from zipfile import ZipFile
+from rd3lib.instrument import job, stage
+from rd3lib.encoders import IMAGE_EXTENSIONS, zip_compress_type
+from rd3lib.tiles import read_dzi
+from zipfile import ZipFile, ZIP_DEFLATED
+import logging
 import os
 import re
 from collections import defaultdict
 
 
+logger = logging.getLogger(__name__)
 app = FastAPI()
 
 UPLOAD_DIR = "./uploads"
 RESULT_DIR = "./results"
+TILE_DIR = os.path.join(RESULT_DIR, "tiles")
+SLICE_DIR = os.path.join(RESULT_DIR, "slices")
+# 'images': 200m 구간 PNG, 'tiles': 측선 전체 Deep Zoom 타일, 'both': 둘 다,
+# 'slices': 모든 채널/깊이 슬라이스와 1m 간격 횡단면 (SLICE_DIR, image200.run 참고)
+OUTPUT = os.environ.get("RD3_OUTPUT", "images")
+# 이미지 인코더 프리셋: png, png_small, fast, webp, jpeg (rd3lib.encoders 참고)
+ENCODER = os.environ.get("RD3_ENCODER", "png")
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 os.makedirs(RESULT_DIR, exist_ok=True)
+os.makedirs(TILE_DIR, exist_ok=True)
 app.mount("/results", StaticFiles(directory="results"), name="results")
+# 뷰어는 현재 확대 단계에서 보이는 타일만 /tiles/{name}_files/{level}/{col}_{row}.png로 요청함
+app.mount("/tiles", StaticFiles(directory=TILE_DIR), name="tiles")
 templates = Jinja2Templates(directory="templates")
 
 process_done = False
@@ -95,16 +110,27 @@ async def process(request: Request):
         if name.endswith(".rd3"):
             filename = name[:-4]
 
-    run()
-    create_zip_from_results(output_zip_path=f"results/{filename}.zip")
+    # 단계별 실행 시간과 메모리 사용량을 results/{filename}_report.json으로 저장
+    with job(filename) as report:
+        run(output=OUTPUT, encoder=ENCODER)
+        create_zip_from_results(output_zip_path=f"results/{filename}.zip")
+    report.save(os.path.join(RESULT_DIR, f"{filename}_report.json"))
     result_images = get_png_list()
 
     return templates.TemplateResponse(request, "Jinja_front.html", {
         "request": request,
         "ready": True,
-        "images": result_images
+        "images": result_images,
+        "tiles": get_tile_list()
     })
 
+@app.get("/tile-sources")
+async def tile_sources():
+    '''
+    results/tiles에 저장된 Deep Zoom 타일 목록 (보기 이름, .dzi 주소, 원본 크기)
+    '''
+    return get_tile_list()
+
 @app.get("/download")
 async def download_result():
     '''
@@ -126,9 +152,9 @@ async def clear_and_redirect():
 
 def get_png_list():
     result_dir = "./results"
-    files = [f for f in os.listdir(result_dir) if f.endswith(".png")]
+    files = [f for f in os.listdir(result_dir) if f.endswith(IMAGE_EXTENSIONS)]
 
-    pattern = re.compile(r"_(\d+)\.png$")
+    pattern = re.compile(r"_(\d+)\.\w+$")
     grouped = defaultdict(list)
 
     for file in files:
@@ -182,27 +208,52 @@ def get_png_list():
             'cross_section_image': cross_section_image # 횡단면 이미지
         })
 
-    print("이미지 정렬 및 그룹화 결과:", final_sorted_groups)
+    logger.debug("이미지 정렬 및 그룹화 결과: %s", final_sorted_groups)
     return final_sorted_groups
 
 
 
+def get_tile_list():
+    '''
+    TILE_DIR의 .dzi 파일을 도로, 평단, 종단 순서로 정렬하여
+    [{'view', 'url', 'width', 'height', 'tile_size'}] 형식으로 반환하는 함수
+    '''
+    if not os.path.isdir(TILE_DIR):
+        return []
+    order = ["도로면", "평단면", "종단면"]
+    tiles = []
+    for file in sorted(os.listdir(TILE_DIR)):
+        if file.endswith(".dzi"):
+            view = file[:-4].rsplit("_", 1)[-1]
+            width, height, tile_size = read_dzi(os.path.join(TILE_DIR, file))
+            tiles.append({"view": view, "url": f"/tiles/{file}",
+                          "width": width, "height": height, "tile_size": tile_size})
+    return sorted(tiles, key=lambda t: order.index(t["view"]) if t["view"] in order else len(order))
+
+
 def create_zip_from_results(output_zip_path: str, result_dir: str = "./results"):
     '''
-    results 안에 있는 png이미지를 zip으로 만들어주는 함수
+    results 안에 있는 이미지를 zip으로 만들어주는 함수
+    이미 압축된 이미지는 다시 압축하지 않고 그대로 저장(ZIP_STORED)함
     '''
-    with ZipFile(output_zip_path, "w") as zipf:
+    with stage('zip', nbytes=0, file=os.path.basename(output_zip_path)) as s, \
+            ZipFile(output_zip_path, "w", compression=ZIP_DEFLATED) as zipf:
         for file in os.listdir(result_dir):
-            if file.endswith(".png"):
-                zipf.write(os.path.join(result_dir, file), arcname=file)
+            if file.endswith(IMAGE_EXTENSIONS):
+                zipf.write(os.path.join(result_dir, file), arcname=file, compress_type=zip_compress_type(file))
+                s.nbytes += os.path.getsize(os.path.join(result_dir, file))
 
 def clear_directories():
     '''
-    디렉토리 안에 있는 파일을 모두 지우는 함수
+    디렉토리 안에 있는 파일을 모두 지우는 함수 (results/tiles의 타일 폴더, results/slices 포함)
     '''
-    for dir_path in ["uploads", "results"]:
+    if os.path.isdir(SLICE_DIR):
+        shutil.rmtree(SLICE_DIR)
+    for dir_path in ["uploads", "results", TILE_DIR]:
         if os.path.exists(dir_path):
             for filename in os.listdir(dir_path):
                 file_path = os.path.join(dir_path, filename)
                 if os.path.isfile(file_path):
-                    os.remove(file_path)
\ No newline at end of file
+                    os.remove(file_path)
+                elif dir_path == TILE_DIR and os.path.isdir(file_path):
+                    shutil.rmtree(file_path)
\ No newline at end of file
@@ -1,5 +1,11 @@
-from .io import readRd3, extractionRad, image_save, road_image_save
-from .processing import reshapeRd3, cutRd3, alignSignal, alignGround, alignChannel, cut_200m
+from .io import readRd3, openRd3, RadHeader, readRadHeader, extractionRad, image_save, road_image_save
+from .processing import reshapeRd3, cutRd3, detect_ground, alignSignal, alignGround, alignChannel, align_volume, cut_200m
 from .visualization import plot_gpr_image
-from .filter import apply_filter
-from .utils import upscale_image, normalize_minmax, chunk_range, rd3_process
+from .filter import apply_filter, apply_filters
+from .filter_cache import FilterCache
+from .encoders import ImageEncoder, get_encoder
+from .render import SharedArray, save_chunk_images
+from .tiles import save_survey_tiles, write_tile_pyramid
+from .export import export_slices
+from .utils import upscale_image, normalize_minmax, amplitude_lut, apply_lut, render_slice, chunk_range, rd3_process
+from .stream import iter_trace_blocks, trim_halo, rd3_process_stream
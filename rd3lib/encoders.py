@@ -0,0 +1,93 @@
+'''
+결과 이미지 인코더 모듈
+image_save, 도로면 이미지, Deep Zoom 타일을 저장할 형식과 압축 옵션을 ImageEncoder로 골라서 사용함
+
+프리셋 (ENCODERS)
+- png: PIL 기본 압축(compress_level 6), 이전과 같은 결과
+- png_small: 가장 작은 PNG (optimize)
+- fast: 압축을 최소로 한 PNG (compress_level 1, 내부 확인용)
+- webp: 무손실 WebP
+- jpeg: 품질 90 JPEG (quality는 1 ~ 95)
+
+옵션을 바꿀 때는 get_encoder('jpeg', quality=80)처럼 사용
+'''
+
+import os
+import zipfile
+from typing import NamedTuple, Tuple
+
+# (PIL 형식, 옵션) → 허용 범위
+_LIMITS = {
+    ('PNG', 'compress_level'): (0, 9),
+    ('WEBP', 'quality'): (0, 100),
+    ('WEBP', 'method'): (0, 6),
+    ('JPEG', 'quality'): (1, 95),
+}
+
+
+class ImageEncoder(NamedTuple):
+    """
+    PIL 이미지를 저장하는 형식과 옵션. 프로세스 풀에 그대로 넘길 수 있도록 옵션은 (이름, 값) 튜플로 가집니다.
+    """
+    name: str
+    format: str  # PIL 저장 형식 (PNG, WEBP, JPEG)
+    extension: str  # 파일 확장자 (점 제외)
+    options: Tuple[Tuple[str, object], ...] = ()
+
+    def save(self, image, path):
+        """
+        image를 path에 저장하고 path를 반환합니다. JPEG는 L/RGB만 저장할 수 있으므로 그 외 모드는 RGB로 바꿉니다.
+        """
+        if self.format == 'JPEG' and image.mode not in ('L', 'RGB'):
+            image = image.convert('RGB')
+        image.save(path, format=self.format, **dict(self.options))
+        return path
+
+
+ENCODERS = {
+    'png': ImageEncoder('png', 'PNG', 'png', (('compress_level', 6),)),
+    'png_small': ImageEncoder('png_small', 'PNG', 'png', (('optimize', True),)),
+    'fast': ImageEncoder('fast', 'PNG', 'png', (('compress_level', 1),)),
+    'webp': ImageEncoder('webp', 'WEBP', 'webp', (('lossless', True), ('quality', 80), ('method', 4))),
+    'jpeg': ImageEncoder('jpeg', 'JPEG', 'jpg', (('quality', 90),)),
+}
+
+# 결과 이미지 확장자 (zip에서 다시 압축하지 않음)
+IMAGE_EXTENSIONS = tuple(sorted({f".{encoder.extension}" for encoder in ENCODERS.values()}))
+
+
+def get_encoder(encoder=None, **options):
+    """
+    이름(ENCODERS의 키)이나 ImageEncoder에 options를 덧붙인 ImageEncoder를 반환합니다.
+
+    :param encoder: 인코더 이름 또는 ImageEncoder (기본값: 'png')
+    :type encoder: str or ImageEncoder
+    :param options: PIL save 옵션 (예: quality=80, compress_level=3)
+    :return: 인코더
+    :rtype: ImageEncoder
+    """
+    if encoder is None:
+        encoder = 'png'
+    if not isinstance(encoder, ImageEncoder):
+        if encoder not in ENCODERS:
+            raise ValueError(f"encoder는 {list(ENCODERS)} 중 하나여야 합니다: {encoder}")
+        encoder = ENCODERS[encoder]
+
+    merged = dict(encoder.options)
+    merged.update(options)
+    for key, value in merged.items():
+        limits = _LIMITS.get((encoder.format, key))
+        if limits is not None and not limits[0] <= value <= limits[1]:
+            raise ValueError(f"{encoder.name}의 {key}는 {limits[0]} ~ {limits[1]} 사이여야 합니다: {value}")
+    return encoder._replace(options=tuple(merged.items()))
+
+
+def zip_compress_type(filename):
+    """
+    zip에 넣을 파일의 압축 방식. 이미 압축된 이미지(IMAGE_EXTENSIONS)는 ZIP_STORED로 다시 압축하지 않습니다.
+
+    :rtype: int
+    """
+    if os.path.splitext(filename)[1].lower() in IMAGE_EXTENSIONS:
+        return zipfile.ZIP_STORED
+    return zipfile.ZIP_DEFLATED
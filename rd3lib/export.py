@@ -0,0 +1,202 @@
+'''
+전체 슬라이스 내보내기 모듈
+image_save가 구간마다 세 장(채널 12, 깊이 30, 트레이스 100)만 저장하는 것과 달리
+200 m 구간마다 모든 채널의 종단면(B-scan), 모든 깊이의 평단면(C-scan)과
+측선 전체에서 spacing_m 간격의 횡단면을 저장함 (검토 및 학습 데이터셋용)
+
+- 구간마다 normalize_minmax(int16 변환표)를 한 번만 적용하고 세 방향 슬라이스는 같은 uint8 배열의 뷰를 사용
+- 크기 변환은 슬라이스 묶음(stack) 전체를 PIL LANCZOS 두 번으로 처리 (resize_stack)
+- 저장은 slices/{방향}/ 아래 번호 붙은 이미지(sequence) 또는 구간·방향별 격자 이미지(atlas) 하나
+- index.json에 파일별 방향, 구간, 슬라이스 번호(채널/깊이/트레이스)와 위치(m)를 기록
+'''
+
+from concurrent.futures import ThreadPoolExecutor
+import json
+import math
+import os
+
+import numpy as np
+from PIL import Image
+
+from rd3lib.encoders import get_encoder
+from rd3lib.instrument import stage
+from rd3lib.io import figure_pixels
+from rd3lib.utils import normalize_minmax
+
+AXES = ('종단면', '평단면', '횡단면')
+LAYOUTS = ('sequence', 'atlas')
+# image_save와 같은 이미지 크기 (가로, 세로)
+FIGURE_SIZES = {
+    '종단면': figure_pixels((20.0, 5.0)),
+    '평단면': figure_pixels((20.0, 3.0)),
+    '횡단면': figure_pixels((3.0, 8.0)),
+}
+
+
+def resize_stack(stack, size):
+    """
+    (슬라이스 수, 세로, 가로) uint8 슬라이스 묶음을 한 번에 size 크기로 바꿉니다.
+
+    PIL LANCZOS는 가로, 세로 방향을 따로 계산하므로 슬라이스들을 세로로 이어 붙인 이미지의 가로만,
+    다시 가로로 이어 붙인 이미지의 세로만 바꾸면 슬라이스 사이에 값이 섞이지 않습니다.
+    따라서 슬라이스마다 Image.resize(size, LANCZOS)를 호출한 결과와 비트 단위로 같고 PIL 호출은 두 번뿐입니다.
+
+    :param stack: (슬라이스 수, 세로, 가로) uint8 배열
+    :type stack: numpy.ndarray
+    :param size: 결과 크기 (가로, 세로)
+    :type size: tuple[int, int]
+    :return: (슬라이스 수, size[1], size[0]) uint8 배열
+    :rtype: numpy.ndarray
+    """
+    width, height = size
+    count, h, w = stack.shape
+    if w != width:
+        tall = Image.fromarray(np.ascontiguousarray(stack).reshape(count * h, w))
+        stack = np.asarray(tall.resize((width, count * h), resample=Image.LANCZOS)).reshape(count, h, width)
+    if h != height:
+        wide = Image.fromarray(np.ascontiguousarray(stack.transpose(1, 0, 2)).reshape(h, count * width))
+        stack = np.asarray(wide.resize((count * width, height), resample=Image.LANCZOS))
+        stack = stack.reshape(height, count, width).transpose(1, 0, 2)
+    return np.ascontiguousarray(stack)
+
+
+def make_atlas(stack, columns=None):
+    """
+    (슬라이스 수, 세로, 가로) 묶음을 하나의 격자 이미지 배열로 이어 붙입니다.
+    k번째 슬라이스는 (k % columns) 열, (k // columns) 행에 놓이고 남는 칸은 0으로 채웁니다.
+
+    :param stack: (슬라이스 수, 세로, 가로) 배열
+    :type stack: numpy.ndarray
+    :param columns: 열 수 (기본값: 격자 이미지가 정사각형에 가깝도록)
+    :type columns: int
+    :return: (격자 배열, 열 수)
+    :rtype: tuple
+    """
+    count, h, w = stack.shape
+    if columns is None:
+        columns = int(round(math.sqrt(count * h / w)))
+    columns = min(max(columns, 1), max(count, 1))
+    rows = math.ceil(count / columns)
+    padded = np.zeros((rows * columns, h, w), dtype=stack.dtype)
+    padded[:count] = stack
+    return padded.reshape(rows, columns, h, w).transpose(0, 2, 1, 3).reshape(rows * h, columns * w), columns
+
+
+def cross_section_traces(traces, distance_interval, spacing_m=1.0):
+    """
+    spacing_m 간격 횡단면의 트레이스 인덱스 (0 m부터)
+
+    :rtype: numpy.ndarray
+    """
+    if spacing_m <= 0:
+        raise ValueError(f"spacing_m은 0보다 커야 합니다: {spacing_m}")
+    positions = np.round(np.arange(0, traces * distance_interval, spacing_m) / distance_interval).astype(int)
+    return np.unique(positions[positions < traces])
+
+
+def export_slices(rd3, filename, chunk_list, distance_interval, savepath="./results/slices", layout='sequence',
+                  spacing_m=1.0, sizes=None, vmin=-3000, vmax=3000, encoder=None, workers=None, axes=AXES):
+    """
+    200 m 구간마다 모든 채널의 종단면, 모든 깊이의 평단면, spacing_m 간격의 횡단면을 저장합니다.
+
+    슬라이스 방향은 image_save와 같습니다. (종단면: rd3[c], 평단면: rd3[:, d], 횡단면: rd3[:, :, t].T)
+    이미지는 normalize_minmax(vmin, vmax)로만 밝기를 정하므로 (image_save의 이미지별 명암 늘림 없음)
+    모든 슬라이스의 밝기 기준이 같습니다.
+
+    :param rd3: 전처리된 (채널, 깊이, 트레이스) 배열
+    :type rd3: numpy.ndarray
+    :param filename: .rd3 파일명 (이미지 파일 이름에 사용)
+    :type filename: str
+    :param chunk_list: chunk_range 결과 ([start, end] 목록)
+    :type chunk_list: list
+    :param distance_interval: 트레이스 간격(m)
+    :type distance_interval: float
+    :param savepath: 저장 경로 (폴더, 기본값: ./results/slices)
+    :type savepath: str
+    :param layout: 'sequence'이면 슬라이스마다 이미지 하나, 'atlas'이면 구간·방향마다 격자 이미지 하나
+    :type layout: str
+    :param spacing_m: 횡단면 간격(m)
+    :type spacing_m: float
+    :param sizes: 방향별 이미지 크기 {방향: (가로, 세로)} (없는 방향은 원본 크기, FIGURE_SIZES 참고)
+    :type sizes: dict
+    :param encoder: 이미지 인코더 또는 프리셋 이름 (rd3lib.encoders 참고, 기본값: 'png')
+    :type encoder: str or rd3lib.encoders.ImageEncoder
+    :param workers: 이미지를 인코딩할 스레드 수 (기본값: CPU 수)
+    :type workers: int
+    :param axes: 저장할 방향들 (AXES의 부분집합)
+    :type axes: iterable[str]
+    :return: index.json 내용 (파일별 axis, chunk, indices, positions_m 등)
+    :rtype: list[dict]
+    """
+    if layout not in LAYOUTS:
+        raise ValueError(f"layout은 {LAYOUTS} 중 하나여야 합니다: {layout}")
+    unknown = set(axes) - set(AXES)
+    if unknown:
+        raise ValueError(f"axes는 {AXES} 중에서 골라야 합니다: {sorted(unknown)}")
+    if rd3.ndim != 3:
+        raise ValueError("입력 데이터는 반드시 3차원이어야 합니다.")
+
+    name = filename.split('.')[0]
+    sizes = sizes or {}
+    encoder = get_encoder(encoder)
+    workers = workers or os.cpu_count() or 1
+    cross = cross_section_traces(rd3.shape[2], distance_interval, spacing_m)
+    for axis in axes:
+        os.makedirs(savepath if layout == 'atlas' else os.path.join(savepath, axis), exist_ok=True)
+
+    def save(array, path):
+        encoder.save(Image.fromarray(array), path)
+
+    index, count = [], 0
+    with stage('export', rd3, file=filename, layout=layout, encoder=encoder.name) as s, \
+            ThreadPoolExecutor(workers) as pool:
+        for number, (start, end) in enumerate(chunk_list):
+            stacks = {}
+            if '종단면' in axes or '평단면' in axes:
+                # 구간 전체를 한 번만 정규화하고 두 방향은 같은 배열의 뷰로 사용
+                normalized = normalize_minmax(rd3[:, :, start:end], vmin, vmax)
+                stacks['종단면'] = (normalized, np.arange(normalized.shape[0]))
+                stacks['평단면'] = (normalized.transpose(1, 0, 2), np.arange(normalized.shape[1]))
+            traces = cross[(cross >= start) & (cross <= end)]
+            if '횡단면' in axes and len(traces):
+                # (채널, 깊이, n) → (n, 깊이, 채널)
+                stacks['횡단면'] = (normalize_minmax(rd3[:, :, traces], vmin, vmax).transpose(2, 1, 0), traces)
+
+            futures = []
+            for axis in axes:
+                if axis not in stacks:
+                    continue
+                stack, labels = stacks[axis]
+                count += len(labels)
+                if axis in sizes:
+                    stack = resize_stack(stack, sizes[axis])
+                entry = dict(axis=axis, chunk=number, indices=labels.tolist(), width=stack.shape[2],
+                             height=stack.shape[1])
+                if axis == '횡단면':
+                    entry['positions_m'] = [round(float(t) * distance_interval, 6) for t in labels]
+
+                if layout == 'atlas':
+                    atlas, columns = make_atlas(stack)
+                    path = os.path.join(savepath, f"{name}_{axis}_{number}_atlas.{encoder.extension}")
+                    futures.append(pool.submit(save, atlas, path))
+                    index.append(dict(entry, file=os.path.relpath(path, savepath), columns=columns))
+                else:
+                    digits = 6 if axis == '횡단면' else 4
+                    files = []
+                    for label, image in zip(labels, stack):
+                        prefix = "" if axis == '횡단면' else f"{number}_"
+                        path = os.path.join(savepath, axis,
+                                            f"{name}_{axis}_{prefix}{int(label):0{digits}d}.{encoder.extension}")
+                        futures.append(pool.submit(save, np.ascontiguousarray(image), path))
+                        files.append(os.path.relpath(path, savepath))
+                    index.append(dict(entry, files=files))
+
+            # 구간마다 인코딩이 끝날 때까지 기다려 메모리 사용량을 구간 크기로 제한
+            for future in futures:
+                future.result()
+        s.extra['slices'] = count
+
+        with open(os.path.join(savepath, "index.json"), 'w', encoding='utf-8') as f:
+            json.dump(dict(file=filename, layout=layout, distance_interval=distance_interval, spacing_m=spacing_m,
+                           vmin=vmin, vmax=vmax, encoder=encoder.name, entries=index), f, ensure_ascii=False)
+    return index
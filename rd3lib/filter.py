@@ -2,193 +2,672 @@
 rd3 파일 데이터 전처리에 사용되는 모든 필터를 적용하는 모듈
 apply_filter(numpy_data)를 사용하면
 default로 지정되어있는 전처리를 하여 numpy_data를 돌려줌
+
+filterCollect.csv는 처음 사용할 때 한 번 읽어 필터 그룹별 FilterPlan(설정이 끝난 필터들의 순서 있는 목록)으로
+컴파일하고, 파일이 수정(mtime 변경)되기 전까지는 캐시된 FilterPlan을 그대로 사용함
 '''
 
 from rd3lib import filter_back_end as filterBack
-
-import pandas as pd
+from rd3lib import filter_cache
+from rd3lib.instrument import stage
+
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
+from typing import Callable, Mapping, NamedTuple
+import csv
+import functools
+import math
+import os
+import time
 import numpy as np
-import copy
 
-def apply_filter(npy_file):
+FILTER_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'filterCollect.csv')
+
+
+def apply_filter(npy_file, group=None, dtype=np.int16, out=None, overwrite_input=False, workers=None,
+                 cache=None, source_key=None):
     """
     RD3 데이터에 필터를 자동 적용하는 함수.
 
     filterCollect.csv 파일에 정의된 필터 중 default == 1로 지정된 필터들을
+    (group을 지정하면 filter_group == group인 필터들을)
     순서대로 적용하여 전처리된 numpy 데이터를 반환합니다.
 
     :param npy_file: 필터를 적용할 3차원 numpy 배열 (RD3 데이터)
     :type npy_file: numpy.ndarray
+    :param group: 적용할 filter_group 이름 (기본값: default == 1인 필터)
+    :type group: str
+    :param dtype: 결과 dtype (기본값: int16)
+    :type dtype: numpy.dtype
+    :param out: 결과를 저장할 배열 (FilterPlan 참고)
+    :type out: numpy.ndarray
+    :param overwrite_input: True이면 npy_file을 작업 버퍼로 사용 (FilterPlan 참고)
+    :type overwrite_input: bool
+    :param workers: 채널 묶음을 나누어 처리할 스레드 수 (기본값: CPU 수)
+    :type workers: int
+    :param cache: 필터 중간 결과 캐시 (FilterPlan 참고)
+    :type cache: rd3lib.filter_cache.FilterCache
+    :param source_key: npy_file의 캐시 키 (기본값: npy_file 내용의 해시)
+    :type source_key: str
     :return: 필터가 적용된 RD3 numpy 배열
     :rtype: numpy.ndarray
     """
-    filter_df = pd.read_csv('./rd3lib/filterCollect.csv')
+    return load_filter_plan(group)(npy_file, dtype, out, overwrite_input, workers, cache, source_key)
 
-    filter_ = filter_worker(npy_file, filter_df)
-    RD3_data = filter_.filterRun()
-    return RD3_data
 
-class filter_worker:
+def apply_filters(npy_file, groups, dtype=np.int16, overwrite_input=False, workers=None):
     """
-        filterCollect.csv의 설정을 바탕으로 RD3 데이터에 다양한 필터를 순차적으로 적용하는 클래스.
-
-        :param data: 필터를 적용할 3차원 numpy 배열 (RD3 데이터)
-        :type data: numpy.ndarray
-        :param filter_df: filterCollect.csv를 pandas로 읽어온 데이터프레임
-        :type filter_df: pandas.DataFrame
-        """
-    def __init__(self, data, filter_df):
-        super().__init__()
-        self.data = data  # rd3를 읽은 3차원 numpy 데이터
-        self.filter_df = filter_df  # filterCollect.csv 로 읽은 데이터프레임
+    여러 필터 그룹을 한 번에 적용하는 함수.
+    그룹들의 앞쪽에 같은 필터(예: alingnSignal, background)가 있으면 한 번만 계산합니다. (FilterDAG 참고)
 
-    def filterRun(self):
-        """
-        filterCollect.csv 내 default == 1로 설정된 필터를
-        filter_order 순서에 따라 적용합니다.
+    :param npy_file: 필터를 적용할 3차원 numpy 배열 (RD3 데이터)
+    :type npy_file: numpy.ndarray
+    :param groups: 적용할 filter_group 이름들 (None은 default == 1인 필터)
+    :type groups: iterable[str]
+    :param dtype: 결과 dtype (기본값: int16)
+    :type dtype: numpy.dtype
+    :param overwrite_input: True이면 npy_file을 작업 버퍼로 사용 (FilterPlan 참고)
+    :type overwrite_input: bool
+    :param workers: 채널 묶음을 나누어 처리할 스레드 수 (기본값: CPU 수)
+    :type workers: int
+    :return: {group: 필터가 적용된 RD3 numpy 배열}
+    :rtype: dict
+    """
+    return FilterDAG(load_filter_plan(group) for group in groups)(npy_file, dtype, overwrite_input, workers)
 
-        적용 가능한 필터:
-        - gain, range, las, edge, average
-        - y_differential, z_differential
-        - sign_smoother, kalman, background
-        - alingnSignal, ch_bias
 
-        :return: 모든 필터가 적용된 RD3 데이터
-        :rtype: numpy.ndarray (dtype=int32)
-        """
-        # start_time = time.time()
-        self.RD3_data = copy.deepcopy(self.data)
+class FilterStep(NamedTuple):
+    """
+    filterCollect.csv 한 행을 컴파일한, 설정이 끝난 필터 하나.
 
-        selectedFilter = self.filter_df[self.filter_df.default == 1].copy()
+    apply(data, stats, first, total)로 필터를 적용하며,
+    fit이 있으면 측선 전체 통계를 fit(blocks)로 먼저 구해 stats로 넘겨야 합니다.
+    fit_source가 True이면 필터 적용 전 원본 데이터로 fit합니다. (ch_bias)
+    halo는 블록 처리 시 블록 양쪽에 필요한 트레이스 수입니다.
+    pointwise가 있으면 점별 필터이며, pointwise(shape, stats)로 fused_pointwise용 연산을 만듭니다.
 
-        selectedFilter = selectedFilter.fillna(0)
-        selectedFilter = selectedFilter.sort_values(by=['filter_order'])
+    apply는 out 배열이 주어지면 결과를 out에 쓰고 out을 반환합니다.
+    dtype은 out으로 받을 결과 dtype이며(None이면 입력을 그대로 돌려주는 필터),
+    inplace가 True이면 out으로 입력 data 자신을 받을 수 있습니다.
 
-        for index, row in selectedFilter.iterrows():
+    full_volume이 False인 필터는 채널마다 독립적으로 계산하므로(fit 결과도 첫 축이 채널)
+    workers가 2 이상이면 채널 묶음으로 나누어 스레드 풀에서 처리합니다.
+    채널 방향으로 섞이는 필터(sign_smoother, ch_bias, kalman)는 full_volume이 True입니다.
+    """
+    name: str
+    base: str
+    order: int
+    params: Mapping
+    apply: Callable
+    fit: Callable = None
+    fit_source: bool = False
+    halo: int = 0
+    pointwise: Callable = None
+    dtype: object = np.int16
+    inplace: bool = False
+    full_volume: bool = False
+
+    def __call__(self, data, stats=None, first=0, total=None, out=None, workers=1):
+        with stage(f'filter.{self.base}', data, filter=self.name) as s:
+            groups = [] if self.full_volume or self.dtype is None else _channel_groups(data.shape[0], workers)
+            if len(groups) > 1:
+                data = self.apply_groups(data, stats, first, total, out, groups)
+            else:
+                data = self.apply(data, stats, first, total, out)
+            return s.output(data)
+
+    @property
+    def key(self):
+        """
+        결과에 영향을 주는 필터 설정(base와 params)을 나타내는 해시 가능한 값.
+        default, filter_order는 결과에 영향을 주지 않으므로 제외합니다.
+        """
+        return self.base, tuple(sorted((name, value) for name, value in self.params.items()
+                                       if name not in ('default', 'filter_order')))
 
-            if row['filter_base'] == 'gain':
-                print('gain start')
-                Gain = filterBack.Gain()
+    def apply_groups(self, data, stats, first, total, out, groups):
+        """
+        채널 묶음마다 apply를 스레드 풀에서 실행하고 out에 모읍니다.
+        (cv2와 NumPy는 계산 중 GIL을 놓으므로 스레드로 병렬 처리됨)
 
-                Gain.y_inter = float(row['y_inter'])
-                Gain.grad_const = float(row['grad_const'])
-                Gain.inflection_point = float(row['inflection_point'])
-                Gain.inflection_range = float(row['inflection_range'])
-                self.RD3_data = Gain.Gain(self.RD3_data)
-                print('gain end')
+        :param groups: 채널 묶음 slice 목록
+        :type groups: list[slice]
+        :return: 필터가 적용된 데이터
+        :rtype: numpy.ndarray
+        """
+        if out is None:
+            out = np.empty(data.shape, dtype=self.dtype)
 
-            elif row['filter_base'] == 'range':
-                print('Range start')
-                Range = filterBack.Range()
+        def run(group):
+            target = out[group]
+            result = self.apply(data[group], None if stats is None else stats[group], first, total, target)
+            if result is not target:
+                target[...] = result
 
-                Range.range_vaule = float(row['range_vaule'])
-                self.ascan_range = int(row['range_vaule'])
-                self.RD3_data = Range.Range(self.RD3_data)
-                print('Range end')
+        with ThreadPoolExecutor(len(groups)) as pool:
+            list(pool.map(run, groups))
+        return out
 
-            elif row['filter_base'] == 'las':
-                print('Las start')
 
-                Las = filterBack.Las()
+def _channel_groups(channels, workers):
+    workers = max(min(workers or 1, channels), 1)
+    bounds = np.linspace(0, channels, workers + 1).astype(int)
+    return [slice(lo, hi) for lo, hi in zip(bounds[:-1], bounds[1:]) if hi > lo]
 
-                Las.las_ratio = float(row['las_ratio'])
-                Las.sigmaNumber = float(row['sigmaNumber'])
-                # Las.las_number = float(row['las_number'])
-                Las.sigma_constants = float(row['sigma_constants'])
-                self.RD3_data = Las.Las(self.RD3_data)
 
-                print('Las end')
+class FilterPlan(tuple):
+    """
+    순서대로 적용할 FilterStep의 불변 목록.
+    plan(data)로 모든 필터를 적용한 배열(기본값 int16)을 얻습니다.
+
+    필터는 계획이 소유한 작업 버퍼에 out으로 결과를 씁니다.
+    제자리 계산이 가능한 필터(inplace)는 현재 버퍼에 그대로 쓰고,
+    이웃 값을 읽는 필터는 두 번째 버퍼에 쓴 뒤 두 버퍼를 번갈아 사용하므로
+    작업 중 메모리는 입력 외에 볼륨 두 개 정도로 제한됩니다.
+
+    :param steps: filter_order 순서로 정렬된 FilterStep들
+    :type steps: iterable[FilterStep]
+    :param group: 필터 그룹 이름 (None이면 default == 1인 필터)
+    :type group: str
+    """
+    def __new__(cls, steps, group=None):
+        plan = super().__new__(cls, steps)
+        plan.group = group
+        return plan
 
-            elif row['filter_base'] == 'edge':
-                print('edge start')
+    def __call__(self, data, dtype=np.int16, out=None, overwrite_input=False, workers=None,
+                 cache=None, source_key=None):
+        """
+        FilterPlan의 필터를 순서대로 적용합니다.
 
-                edge = filterBack.edge()
+        :param data: 필터를 적용할 3차원 numpy 배열
+        :type data: numpy.ndarray
+        :param dtype: 결과 dtype (out이 있으면 out의 dtype)
+        :type dtype: numpy.dtype
+        :param out: 결과를 저장할 배열 (마지막 필터가 직접 씀)
+        :type out: numpy.ndarray
+        :param overwrite_input: True이면 data를 첫 작업 버퍼로 사용하여 덮어씀
+        :type overwrite_input: bool
+        :param workers: 채널 묶음을 나누어 처리할 스레드 수 (기본값: CPU 수)
+        :type workers: int
+        :param cache: 필터 중간 결과 캐시. 앞쪽 필터들의 결과가 캐시에 있으면 그 다음 필터부터 실행하고,
+                      실행한 필터의 결과는 (source_key, 앞쪽 필터 설정들)을 키로 저장합니다.
+        :type cache: rd3lib.filter_cache.FilterCache
+        :param source_key: data의 캐시 키 (기본값: data 내용의 해시)
+        :type source_key: str
+        :return: 모든 필터가 적용된 RD3 데이터
+        :rtype: numpy.ndarray
+        """
+        data = np.asarray(data)
+        with stage('filter', data, group=self.group) as s:
+            return s.output(self._apply(data, dtype, out, overwrite_input, workers, cache, source_key))
+
+    def _apply(self, data, dtype, out, overwrite_input, workers, cache, source_key):
+        workers = workers or os.cpu_count() or 1
+        dtype = np.dtype(dtype if out is None else out.dtype)
+        RD3_data, owned, spare = data, overwrite_input, None
+
+        start, keys = 0, None
+        if cache is not None:
+            keys = filter_cache.prefix_keys(source_key or filter_cache.content_key(data), self)
+            for k in range(len(self), 0, -1):
+                cached = cache.get(keys[k - 1])
+                if cached is not None:
+                    # 캐시의 배열은 읽기 전용이므로 다음 필터는 새 버퍼에 씀
+                    RD3_data, owned, start = cached, False, k
+                    break
+
+        # 원본으로 fit하는 필터는 data를 덮어쓰기 전에 통계를 구함
+        source_stats = {k: self[k].fit([data]) for k in range(start, len(self))
+                        if self[k].fit is not None and self[k].fit_source}
+
+        for k in range(start, len(self)):
+            step = self[k]
+            stats = source_stats[k] if k in source_stats else None
+            if step.fit is not None and not step.fit_source:
+                stats = step.fit([RD3_data])
+
+            if step.inplace and not any(later.dtype is not None and not later.inplace for later in self[k + 1:]):
+                # 남은 필터가 모두 제자리 계산이면 두 번째 버퍼는 필요 없음
+                spare = None
+
+            target = None
+            if k == len(self) - 1 and out is not None and step.dtype == dtype \
+                    and (step.inplace or not np.may_share_memory(out, RD3_data)):
+                target = out
+            elif step.dtype is not None:
+                if step.inplace and owned and RD3_data.dtype == step.dtype:
+                    target = RD3_data
+                elif spare is not None and spare.dtype == step.dtype:
+                    target = spare
+                else:
+                    spare = None
+                    target = np.empty(RD3_data.shape, dtype=step.dtype)
+
+            result = step(RD3_data, stats, out=target, workers=workers)
+            if result is not RD3_data:
+                # 이전 버퍼는 다음 필터의 출력 버퍼로 재사용
+                RD3_data, spare = result, RD3_data if owned else None
+                owned = result is not out
+            if keys is not None and step.dtype is not None:
+                cache.put(keys[k], RD3_data)
+
+        if out is not None:
+            if RD3_data is not out:
+                np.copyto(out, RD3_data, casting='unsafe')
+            return out
+        if owned and RD3_data.dtype == dtype:
+            return RD3_data
+        return RD3_data.astype(dtype)
+
+    def speedup_report(self, data, workers=None):
+        """
+        필터를 순서대로 적용하면서 필터마다 1개 스레드와 workers개 스레드로 각각 실행해
+        실행 시간과 속도 향상 비율을 측정합니다. 두 실행의 결과가 다르면 ValueError를 발생시킵니다.
 
-                edge.edge_range = float(row['edge_range'])
-                self.RD3_data = edge.edge(self.RD3_data)
+        :param data: 필터를 적용할 3차원 numpy 배열
+        :type data: numpy.ndarray
+        :param workers: 비교할 스레드 수 (기본값: CPU 수)
+        :type workers: int
+        :return: 필터별 name, base, full_volume, serial(초), parallel(초), speedup
+        :rtype: list[dict]
+        """
+        data = np.asarray(data)
+        workers = workers or os.cpu_count() or 1
+        RD3_data = data
+        report = []
+        for step in self:
+            stats = None
+            if step.fit is not None:
+                stats = step.fit([data if step.fit_source else RD3_data])
+
+            results, times = [], []
+            for count in (1, workers):
+                # 제자리 계산으로 입력이 바뀌지 않도록 실행마다 새 출력 버퍼 사용
+                target = None if step.dtype is None else np.empty(RD3_data.shape, dtype=step.dtype)
+                start = time.perf_counter()
+                results.append(step(RD3_data, stats, out=target, workers=count))
+                times.append(time.perf_counter() - start)
+            if not np.array_equal(results[0], results[1]):
+                raise ValueError(f"{step.name}: 스레드 수에 따라 결과가 다릅니다.")
+
+            report.append(dict(name=step.name, base=step.base, full_volume=step.full_volume,
+                               serial=times[0], parallel=times[1],
+                               speedup=times[0] / times[1] if times[1] else float('inf')))
+            RD3_data = results[1]
+        return report
+
+
+class _DagNode:
+    # step까지 적용한 결과를 나타내는 FilterDAG의 노드
+    def __init__(self, step=None):
+        self.step = step
+        self.children = {}  # FilterStep.key → _DagNode
+        self.groups = []  # 이 노드의 결과가 최종 결과인 group들
+
+    def walk(self):
+        yield self
+        for child in self.children.values():
+            yield from child.walk()
+
+
+class FilterDAG:
+    """
+    여러 FilterPlan을 앞쪽의 같은 필터를 공유하는 트리로 묶은 실행 계획.
+    dag(data)로 {group: 결과 배열}을 얻으며, 각 결과는 FilterPlan을 하나씩 실행한 것과 같습니다.
 
-                print('edge end')
+    필터 설정(FilterStep.key)이 같은 앞부분은 한 번만 계산하고, 갈라지는 지점의 결과는
+    그 뒤의 갈래들이 모두 끝날 때까지만 보관합니다. (마지막 갈래는 그 버퍼를 작업 버퍼로 이어 씀)
+    한 갈래로 이어지는 필터들은 FilterPlan으로 실행하므로 작업 버퍼 재사용 규칙은 FilterPlan과 같습니다.
 
-            elif row['filter_base'] == 'average':
-                print('average start')
+    :param plans: 함께 실행할 FilterPlan들 (group이 서로 달라야 함)
+    :type plans: iterable[FilterPlan]
+    """
+    def __init__(self, plans):
+        self.plans = tuple(plans)
+        groups = [plan.group for plan in self.plans]
+        if len(set(groups)) != len(groups):
+            raise ValueError(f"같은 필터 그룹이 여러 번 지정되었습니다: {groups}")
+
+        self.root = _DagNode()
+        for plan in self.plans:
+            node = self.root
+            for step in plan:
+                node = node.children.setdefault(step.key, _DagNode(step))
+            node.groups.append(plan.group)
+
+    def __len__(self):
+        """ 실행할 필터 수 (공유하는 필터는 한 번만 셈) """
+        return sum(1 for _ in self.root.walk()) - 1
+
+    def __call__(self, data, dtype=np.int16, overwrite_input=False, workers=None):
+        """
+        모든 FilterPlan의 필터를 적용합니다.
 
-                average = filterBack.average()
+        :param data: 필터를 적용할 3차원 numpy 배열
+        :type data: numpy.ndarray
+        :param dtype: 결과 dtype
+        :type dtype: numpy.dtype
+        :param overwrite_input: True이면 data를 첫 작업 버퍼로 사용하여 덮어씀
+        :type overwrite_input: bool
+        :param workers: 채널 묶음을 나누어 처리할 스레드 수 (기본값: CPU 수)
+        :type workers: int
+        :return: {group: 모든 필터가 적용된 RD3 데이터} (plans 순서)
+        :rtype: dict
+        """
+        data = np.asarray(data)
+        dtype = np.dtype(dtype)
+
+        with stage('filter_dag', data, groups=[plan.group for plan in self.plans], steps=len(self)):
+            # 원본으로 fit하는 필터는 data를 덮어쓰기 전에 통계를 구해 두고 그 통계를 쓰는 필터로 바꿈
+            bound = {}
+            for node in self.root.walk():
+                if node.step is not None and node.step.fit is not None and node.step.fit_source:
+                    stats = node.step.fit([data])
+                    bound[id(node)] = node.step._replace(fit=lambda blocks, stats=stats: stats, fit_source=False)
+
+            results = {}
+            self._run(self.root, data, overwrite_input, dtype, workers, bound, results)
+        return {plan.group: results[plan.group] for plan in self.plans}
+
+    def _run(self, node, volume, owned, dtype, workers, bound, results):
+        consumers = [(group, None) for group in node.groups] + [(None, child) for child in node.children.values()]
+        for i, (group, child) in enumerate(consumers):
+            # 마지막으로 volume을 쓰는 갈래만 volume을 덮어쓸 수 있음
+            last = owned and i == len(consumers) - 1
+            if group is not None:
+                results[group] = volume if last and volume.dtype == dtype else volume.astype(dtype)
+                continue
+
+            # 갈라지거나 끝나는 노드까지 이어지는 필터들을 하나의 FilterPlan으로 실행
+            chain = [child]
+            while len(chain[-1].children) == 1 and not chain[-1].groups:
+                chain.extend(chain[-1].children.values())
+            steps = [bound.get(id(link), link.step) for link in chain]
+            step_dtype = next((step.dtype for step in reversed(steps) if step.dtype is not None), volume.dtype)
+            # FilterPlan의 결과는 volume을 넘겨받았거나 새로 만든 버퍼이므로 다음 갈래들이 덮어써도 됨
+            result = FilterPlan(steps)(volume, step_dtype, overwrite_input=last, workers=workers)
+            self._run(chain[-1], result, True, dtype, workers, bound, results)
+
+
+def _number(value):
+    # pandas의 fillna(0)와 같이 빈 칸은 0으로 취급
+    if value is None or value == '':
+        return 0.0
+    value = float(value)
+    return 0.0 if math.isnan(value) else value
+
+
+def _build_gain(params):
+    Gain = filterBack.Gain()
+    Gain.y_inter = params['y_inter']
+    Gain.grad_const = params['grad_const']
+    Gain.inflection_point = params['inflection_point']
+    Gain.inflection_range = params['inflection_range']
+    return dict(apply=lambda data, stats, first, total, out: Gain.Gain(data, out),
+                pointwise=Gain.pointwise, inplace=True)
+
+
+def _build_range(params):
+    Range = filterBack.Range()
+    Range.range_vaule = params['range_vaule']
+    return dict(apply=lambda data, stats, first, total, out: Range.Range(data, out),
+                pointwise=Range.pointwise, inplace=True)
+
+
+def _build_las(params):
+    Las = filterBack.Las()
+    Las.las_ratio = params['las_ratio']
+    Las.sigmaNumber = params['sigmaNumber']
+    Las.sigma_constants = params['sigma_constants']
+    return dict(apply=lambda data, stats, first, total, out: Las.Las(data, first, total, out),
+                halo=Las.trace_halo())
+
+
+def _build_edge(params):
+    edge = filterBack.edge()
+    edge.edge_range = params['edge_range']
+    return dict(apply=lambda data, stats, first, total, out: edge.edge(data, out),
+                pointwise=edge.pointwise, inplace=True)
+
+
+def _build_average(params):
+    average = filterBack.average()
+    average.depth = int(params['depth_para'])
+    average.dist = int(params['dist_para'])
+    return dict(apply=lambda data, stats, first, total, out: average.average(data, out),
+                halo=average.trace_halo(), inplace=True)
+
+
+def _build_y_differential(params):
+    y_differential = filterBack.y_differential()
+    y_differential.y_window_para = int(params['y_window_para'])
+    return dict(apply=lambda data, stats, first, total, out: y_differential.y_differential(data, out),
+                halo=y_differential.trace_halo(), inplace=True)
+
+
+def _build_z_differential(params):
+    z_differential = filterBack.z_differential()
+    z_differential.z_window_para = int(params['z_window_para'])
+    return dict(apply=lambda data, stats, first, total, out: z_differential.z_differential(data, out),
+                inplace=True)
+
+
+def _build_sign_smoother(params):
+    if int(params['sign_smoother_check']) != 2:
+        return {}
+    sign_smoother = filterBack.sign_smoother()
+    return dict(apply=lambda data, stats, first, total, out: sign_smoother.run_with_npy(data, out),
+                halo=sign_smoother.trace_halo(), inplace=True, full_volume=True)
+
+
+def _build_kalman(params):
+    axis = int(params['axis_para'])
+    percentvar = params['percent_var_para']
+    gain = params['gain_para']
+
+    def apply(data, stats, first, total, out):
+        # kalman_filter는 입력 데이터를 보관하므로 호출마다 새로 생성
+        return filterBack.kalman_filter(axis=axis, percentvar=percentvar, gain=gain).run(data, out)
+    # axis=0은 채널 방향으로 섞이고, 그 외 축은 kalman_filter가 자체 스레드로 나누어 처리
+    return dict(apply=apply, inplace=True, full_volume=True)
+
+
+def _build_background(params):
+    if int(params['background_check']) != 2:
+        return {}
+    Backgroud_remove = filterBack.Backgroud_remove()
+    Backgroud_remove.percent = params['background_percent']
+    return dict(apply=lambda data, stats, first, total, out: Backgroud_remove.apply(data, stats, out),
+                fit=Backgroud_remove.fit, inplace=True)
+
+
+def _build_alingnSignal(params):
+    if int(params['alingnSignal_check']) != 2:
+        return {}
+    alingnSignal = filterBack.alingnSignal()
+    return dict(apply=lambda data, stats, first, total, out: alingnSignal.apply(data, stats, out),
+                fit=alingnSignal.fit, inplace=True)
+
+
+def _build_ch_bias(params):
+    if int(params['ch_bias_check']) != 2:
+        return {}
+    ch_bias = filterBack.ch_bias()
+    # ch_bias는 필터 적용 전 데이터의 평균을 기준으로 함
+    return dict(apply=lambda data, stats, first, total, out: ch_bias.ch_bias(data, stats, out),
+                fit=ch_bias.fit, fit_source=True, pointwise=ch_bias.pointwise,
+                dtype=np.float64, inplace=True, full_volume=True)
+
+
+FILTER_BUILDERS = {
+    'gain': _build_gain,
+    'range': _build_range,
+    'las': _build_las,
+    'edge': _build_edge,
+    'average': _build_average,
+    'y_differential': _build_y_differential,
+    'z_differential': _build_z_differential,
+    'sign_smoother': _build_sign_smoother,
+    'kalman': _build_kalman,
+    'background': _build_background,
+    'alingnSignal': _build_alingnSignal,
+    'ch_bias': _build_ch_bias,
+}
+
+
+def compile_step(row):
+    """
+    filterCollect.csv의 한 행을 FilterStep으로 컴파일합니다.
+    check 값이 2가 아니어서 적용되지 않는 필터는 입력을 그대로 돌려주는 FilterStep이 됩니다.
 
-                average.depth = int(row['depth_para'])
-                average.dist = int(row['dist_para'])
-                self.RD3_data = average.average(self.RD3_data)
+    :param row: filterCollect.csv의 필터 설정 행
+    :type row: Mapping
+    :return: 설정이 끝난 필터
+    :rtype: FilterStep
+    """
+    base = row['filter_base']
+    if base not in FILTER_BUILDERS:
+        raise ValueError(f"알 수 없는 filter_base: {base}")
 
-                print('average end')
+    params = {key: _number(value) for key, value in row.items()
+              if key not in ('', 'filter_group', 'filter_base', 'filter_name')}
+    # 적용되지 않는 필터(빈 설정)는 입력을 그대로 돌려줌
+    spec = FILTER_BUILDERS[base](params) or dict(apply=lambda data, stats, first, total, out: data, dtype=None)
+    return FilterStep(row['filter_name'], base, int(params['filter_order']), MappingProxyType(params), **spec)
 
-            elif row['filter_base'] == 'y_differential':
-                print('y_differential start')
 
-                y_differential = filterBack.y_differential()
-                y_differential.y_window_para = int(row['y_window_para'])
-                self.RD3_data = y_differential.y_differential(self.RD3_data)
+def compile_filter_plan(rows, group=None):
+    """
+    filterCollect.csv 행들에서 group에 해당하는 필터를 filter_order 순서의 FilterPlan으로 컴파일합니다.
+
+    :param rows: filterCollect.csv의 필터 설정 행들
+    :type rows: iterable[Mapping]
+    :param group: filter_group 이름 (None이면 default == 1인 필터)
+    :type group: str
+    :return: 컴파일된 필터 계획
+    :rtype: FilterPlan
+    """
+    if group is None:
+        selected = [row for row in rows if _number(row['default']) == 1]
+    else:
+        selected = [row for row in rows if row['filter_group'] == group]
 
-                print('y_differential end')
+    steps = sorted((compile_step(row) for row in selected), key=lambda step: step.order)
+    return FilterPlan(fuse_pointwise(steps), group)
 
-            elif row['filter_base'] == 'z_differential':
-                print('y_differential start')
 
-                z_differential = filterBack.z_differential()
-                z_differential.z_window_para = int(row['z_window_para'])
-                self.RD3_data = z_differential.z_differential(self.RD3_data)
+def _fused_step(run):
+    fitted = next((step for step in run if step.fit is not None), None)
 
-                print('y_differential end')
+    def apply(data, stats, first, total, out):
+        ops = [step.pointwise(data.shape, stats if step is fitted else None) for step in run]
+        return filterBack.fused_pointwise(data, ops, out)
 
-            elif row['filter_base'] == 'sign_smoother':
-                print('sign_smoother start')
+    # 묶음마다 읽은 뒤 쓰므로 제자리 계산 가능
+    params = MappingProxyType({'steps': tuple(step.key for step in run)})
+    return FilterStep('+'.join(step.name for step in run), 'fused', run[0].order, params, apply,
+                      fit=None if fitted is None else fitted.fit,
+                      fit_source=fitted is not None and fitted.fit_source,
+                      dtype=run[-1].dtype, inplace=True,
+                      full_volume=any(step.full_volume for step in run))
 
-                sign_smoother = filterBack.sign_smoother()
-                # sign_smoother.runable = int(row['sign_smoother_check'])
-                if int(row['sign_smoother_check']) == 2:
-                    self.RD3_data = sign_smoother.run_with_npy(self.RD3_data)
 
-                print('sign_smoother end')
+def fuse_pointwise(steps):
+    """
+    연속된 점별 필터(gain, range, edge, ch_bias)를 base가 'fused'인 FilterStep 하나로 합칩니다.
+    합친 FilterStep은 fused_pointwise로 데이터를 한 번만 읽고 쓰며, 결과는 하나씩 적용한 것과 같습니다.
 
-            elif row['filter_base'] == 'kalman':
-                print('kalman start')
+    fit이 필요한 필터는 묶음마다 하나까지만 합치며, 원본 데이터로 fit하지 않는 필터는 묶음의 처음에만 올 수 있습니다.
 
-                kalman_filter = filterBack.kalman_filter()
-                kalman_filter.axis = int(row['axis_para'])
-                kalman_filter.percentvar = float(row['percent_var_para'])
-                kalman_filter.gain = float(row['gain_para'])
+    :param steps: filter_order 순서로 정렬된 FilterStep들
+    :type steps: iterable[FilterStep]
+    :return: 점별 필터 묶음이 합쳐진 FilterStep 목록
+    :rtype: list[FilterStep]
+    """
+    fused, run = [], []
+
+    def close():
+        fused.extend(run if len(run) == 1 else [_fused_step(tuple(run))] if run else [])
+        run.clear()
+
+    for step in steps:
+        if step.pointwise is None:
+            close()
+            fused.append(step)
+            continue
+        if step.fit is not None and (any(member.fit is not None for member in run)
+                                     or (run and not step.fit_source)):
+            close()
+        run.append(step)
+    close()
+    return fused
+
+
+def read_filter_rows(path=FILTER_CSV):
+    """
+    filterCollect.csv를 읽어 행별 딕셔너리 튜플로 반환합니다.
 
-                self.RD3_data = kalman_filter.run(self.RD3_data)
+    :param path: filterCollect.csv 경로
+    :type path: str
+    :return: 필터 설정 행들
+    :rtype: tuple[dict]
+    """
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        return tuple(csv.DictReader(f))
 
-                print('kalman end')
 
-            elif row['filter_base'] == 'background':
-                print('background start')
+@functools.lru_cache(maxsize=64)
+def _loadFilterPlan(path, mtime_ns, size, group):
+    # (경로, 수정 시각, 크기)가 키에 포함되므로 파일이 바뀌면 자동으로 다시 컴파일됨
+    return compile_filter_plan(read_filter_rows(path), group)
 
-                Backgroud_remove = filterBack.Backgroud_remove()
-                Backgroud_remove.percent = float(row['background_percent'])
-                # sign_smoother.runable = int(row['sign_smoother_check'])
-                if int(row['background_check']) == 2:
-                    self.RD3_data = Backgroud_remove.run(self.RD3_data)
 
-                print('background end')
+def load_filter_plan(group=None, path=FILTER_CSV):
+    """
+    filterCollect.csv를 컴파일한 FilterPlan을 반환합니다.
+    파일이 수정되지 않았으면 캐시된 FilterPlan을 그대로 돌려줍니다.
+
+    :param group: filter_group 이름 (None이면 default == 1인 필터)
+    :type group: str
+    :param path: filterCollect.csv 경로
+    :type path: str
+    :return: 컴파일된 필터 계획
+    :rtype: FilterPlan
+    """
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    return _loadFilterPlan(path, stat.st_mtime_ns, stat.st_size, group)
 
-            elif row['filter_base'] == 'alingnSignal':
-                print('alingnSignal start')
 
-                alingnSignal = filterBack.alingnSignal()
-                # sign_smoother.runable = int(row['sign_smoother_check'])
-                if int(row['alingnSignal_check']) == 2:
-                    self.RD3_data = alingnSignal.alingnSignal(self.RD3_data)
+class filter_worker:
+    """
+        filterCollect.csv의 설정을 바탕으로 RD3 데이터에 다양한 필터를 순차적으로 적용하는 클래스.
 
-                print('alingnSignal end')
+        :param data: 필터를 적용할 3차원 numpy 배열 (RD3 데이터)
+        :type data: numpy.ndarray
+        :param filter_df: filterCollect.csv의 행들 (pandas.DataFrame도 가능)
+        :type filter_df: iterable[Mapping]
+        """
+    def __init__(self, data, filter_df):
+        super().__init__()
+        self.data = data  # rd3를 읽은 3차원 numpy 데이터
+        if hasattr(filter_df, 'to_dict'):
+            filter_df = filter_df.to_dict('records')
+        self.plan = compile_filter_plan(filter_df)  # default == 1인 필터 계획
 
-            elif row['filter_base'] == 'ch_bias':
-                print('ch_bias start')
-                self.start_bias = np.mean(self.data, axis=(1, 2))
-                ch_bias = filterBack.ch_bias()
-                # sign_smoother.runable = int(row['sign_smoother_check'])
-                if int(row['ch_bias_check']) == 2:
-                    self.RD3_data = ch_bias.ch_bias(self.RD3_data, self.start_bias)
+    def filterRun(self):
+        """
+        filterCollect.csv 내 default == 1로 설정된 필터를
+        filter_order 순서에 따라 적용합니다.
 
-                print('ch_bias end')
+        적용 가능한 필터:
+        - gain, range, las, edge, average
+        - y_differential, z_differential
+        - sign_smoother, kalman, background
+        - alingnSignal, ch_bias
 
-        return np.int32(self.RD3_data)
\ No newline at end of file
+        :return: 모든 필터가 적용된 RD3 데이터
+        :rtype: numpy.ndarray (dtype=int32)
+        """
+        return self.plan(self.data, np.int32)
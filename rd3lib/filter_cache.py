@@ -0,0 +1,222 @@
+'''
+필터 중간 결과 캐시 모듈
+FilterPlan을 실행할 때 (입력 데이터 해시, 앞에서부터 적용한 필터 설정들)을 키로 각 필터의 결과를 저장해두므로,
+뒤쪽 필터의 설정만 바꾸어 다시 실행하면 바뀐 필터부터만 다시 계산함
+
+결과는 메모리와 디스크 두 단계에 저장하며, 단계마다 바이트 예산을 넘으면 가장 오래 사용하지 않은 결과부터 내보냄
+(메모리에서 밀려난 결과는 디스크 예산이 있으면 디스크로 옮기고, 디스크에서 찾은 결과는 다시 메모리로 올림)
+'''
+
+from collections import OrderedDict
+import hashlib
+import os
+import threading
+
+import numpy as np
+
+
+# 필터 계산에 쓰이는 rd3lib 모듈 (filter, filter_back_end가 직접 또는 processing을 거쳐 import하는 모듈)
+FILTER_MODULES = ('filter.py', 'filter_back_end.py', 'processing.py', 'utils.py', 'io.py')
+
+
+def _code_version():
+    # 필터 구현이 바뀌면 디스크에 남은 이전 결과를 쓰지 않도록 모듈 파일 내용의 해시를 키에 포함
+    # (mtime만 바뀐 checkout이나 touch에는 영향을 받지 않음)
+    here = os.path.dirname(os.path.abspath(__file__))
+    digest = hashlib.blake2b(digest_size=16)
+    for name in FILTER_MODULES:
+        with open(os.path.join(here, name), 'rb') as f:
+            digest.update(name.encode() + b'\0' + f.read())
+    return digest.hexdigest()
+
+
+CODE_VERSION = _code_version()
+
+
+def content_key(data):
+    """
+    배열의 shape, dtype, 값으로 계산한 해시 문자열을 반환합니다.
+    첫 번째 축의 슬라이스 단위로 해시하므로 배열 전체를 복사하지 않습니다.
+
+    :param data: 해시할 배열 (np.memmap도 가능)
+    :type data: numpy.ndarray
+    :return: 32자리 16진수 해시
+    :rtype: str
+    """
+    data = np.asarray(data)
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr((data.shape, data.dtype.str)).encode())
+    for part in data.reshape((-1,) + data.shape[-2:]) if data.ndim > 2 else [data]:
+        digest.update(np.ascontiguousarray(part).data)
+    return digest.hexdigest()
+
+
+def chain_key(key, config):
+    """
+    이전 키와 다음 단계 설정으로 새 키를 만듭니다.
+
+    :param key: 이전 단계까지의 키
+    :type key: str
+    :param config: 다음 단계 설정 (repr이 같으면 같은 설정)
+    :type config: object
+    :return: 32자리 16진수 해시
+    :rtype: str
+    """
+    return hashlib.blake2b(repr((key, CODE_VERSION, config)).encode(), digest_size=16).hexdigest()
+
+
+def prefix_keys(source_key, steps):
+    """
+    steps의 앞에서부터 k + 1개를 적용한 결과의 키 목록을 반환합니다.
+
+    :param source_key: 입력 데이터의 키 (content_key 결과 등)
+    :type source_key: str
+    :param steps: 순서대로 적용할 FilterStep들
+    :type steps: iterable[FilterStep]
+    :return: 단계별 키
+    :rtype: list[str]
+    """
+    keys = []
+    for step in steps:
+        source_key = chain_key(source_key, step.key)
+        keys.append(source_key)
+    return keys
+
+
+class FilterCache:
+    """
+    필터 중간 결과를 저장하는 메모리/디스크 2단계 LRU 캐시.
+    저장한 배열은 읽기 전용 복사본이며, 여러 스레드에서 함께 사용할 수 있습니다.
+
+    :param memory_bytes: 메모리 단계 바이트 예산
+    :type memory_bytes: int
+    :param disk_bytes: 디스크 단계 바이트 예산 (0이면 디스크를 사용하지 않음)
+    :type disk_bytes: int
+    :param directory: 디스크 단계 디렉토리 (이미 저장된 결과는 다시 사용함)
+    :type directory: str
+    """
+    def __init__(self, memory_bytes=1 << 30, disk_bytes=0, directory=None):
+        if disk_bytes and directory is None:
+            raise ValueError("디스크 예산을 사용하려면 directory가 필요합니다.")
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()  # 키 → 배열 (오래 사용하지 않은 순서)
+        self._disk = OrderedDict()  # 키 → 파일 크기
+        self._lock = threading.RLock()
+
+        if directory is not None and disk_bytes:
+            os.makedirs(directory, exist_ok=True)
+            entries = [entry for entry in os.scandir(directory) if entry.name.endswith('.npy')]
+            for entry in sorted(entries, key=lambda entry: entry.stat().st_mtime_ns):
+                self._disk[entry.name[:-4]] = entry.stat().st_size
+            self._evict_disk()
+
+    @property
+    def memory_usage(self):
+        """ 메모리 단계에 저장된 바이트 수 """
+        return sum(array.nbytes for array in self._memory.values())
+
+    @property
+    def disk_usage(self):
+        """ 디스크 단계에 저장된 바이트 수 """
+        return sum(self._disk.values())
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._memory or key in self._disk
+
+    def get(self, key):
+        """
+        key에 저장된 결과를 반환합니다. 디스크에서 찾은 결과는 메모리 예산에 들어가면 메모리 단계로 올리고,
+        들어가지 않으면 파일을 다시 쓰지 않고 디스크 단계에 둡니다.
+
+        :param key: 캐시 키
+        :type key: str
+        :return: 읽기 전용 배열 (없으면 None)
+        :rtype: numpy.ndarray
+        """
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return self._memory[key]
+            if key in self._disk:
+                array = np.load(self._path(key))
+                array.setflags(write=False)
+                self.hits += 1
+                if array.nbytes > self.memory_bytes:
+                    self._disk.move_to_end(key)
+                    return array
+                self._remove_disk(key)
+                self._store(key, array)
+                return array
+            self.misses += 1
+            return None
+
+    def put(self, key, array):
+        """
+        결과의 읽기 전용 복사본을 저장합니다.
+        메모리와 디스크 예산 어느 쪽에도 들어가지 않으면 저장하지 않고, 디스크에만 들어가면 복사 없이 파일로 씁니다.
+
+        :param key: 캐시 키
+        :type key: str
+        :param array: 저장할 배열
+        :type array: numpy.ndarray
+        """
+        with self._lock:
+            if key in self:
+                self.get(key)
+                return
+            array = np.asarray(array)
+            if array.nbytes > max(self.memory_bytes, self.disk_bytes):
+                return
+            if array.nbytes > self.memory_bytes:
+                self._write_disk(key, array)
+                return
+            stored = np.array(array)
+            stored.setflags(write=False)
+            self._store(key, stored)
+
+    def clear(self):
+        """ 메모리와 디스크에 저장된 결과를 모두 지웁니다. """
+        with self._lock:
+            self._memory.clear()
+            for key in list(self._disk):
+                self._remove_disk(key)
+
+    def _store(self, key, array):
+        if array.nbytes > self.memory_bytes:
+            self._write_disk(key, array)
+            return
+        self._memory[key] = array
+        while self.memory_usage > self.memory_bytes:
+            old_key, old = self._memory.popitem(last=False)
+            self._write_disk(old_key, old)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f'{key}.npy')
+
+    def _write_disk(self, key, array):
+        if array.nbytes > self.disk_bytes:
+            return
+        path = self._path(key)
+        # 쓰는 도중의 파일을 다른 캐시가 읽지 않도록 임시 파일에 쓴 뒤 교체
+        with open(path + '.tmp', 'wb') as f:
+            np.save(f, array)
+        os.replace(path + '.tmp', path)
+        self._disk[key] = os.path.getsize(path)
+        self._evict_disk()
+
+    def _remove_disk(self, key):
+        self._disk.pop(key)
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def _evict_disk(self):
+        while self._disk and self.disk_usage > self.disk_bytes:
+            self._remove_disk(next(iter(self._disk)))
@@ -0,0 +1,225 @@
+'''
+처리 단계별 계측 모듈
+stage(name, data)로 감싼 구간마다 실행 시간(wall, CPU), 메모리(tracemalloc 최대 사용량 또는 RSS 변화),
+입력/출력 shape와 dtype, 처리한 바이트 수를 기록하여 logging으로 내보냄
+
+job(name) 안에서 실행한 단계들은 JobReport에 모이므로 작업마다 JSON 보고서로 저장할 수 있음
+    with job("SBR_013") as report:
+        rd3 = rd3_process(DIRNAME, BASENAME)
+    report.save("./results/SBR_013_report.json")
+'''
+
+from contextvars import ContextVar
+import contextlib
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_job = ContextVar('rd3lib_job', default=None)
+_stage = ContextVar('rd3lib_stage', default=None)
+
+
+def _rss():
+    # 현재 RSS(바이트), 알 수 없으면 None
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _describe(data):
+    # 배열이면 (shape, dtype, 바이트 수), 아니면 None
+    if isinstance(data, np.ndarray):
+        return list(data.shape), data.dtype.name, int(data.nbytes)
+    return None
+
+
+class JobReport:
+    """
+    작업 하나에서 실행한 단계들의 계측 결과 목록.
+    각 단계는 stage의 record와 같은 딕셔너리이며, 여러 스레드에서 함께 추가할 수 있습니다.
+
+    :param name: 작업 이름
+    :type name: str
+    :param memory: 메모리 측정 방식 ('tracemalloc' 또는 'rss')
+    :type memory: str
+    """
+    def __init__(self, name, memory='rss'):
+        self.name = name
+        self.memory = memory
+        self.started = time.time()
+        self.stages = []
+        self._lock = threading.Lock()
+
+    def add(self, record):
+        with self._lock:
+            self.stages.append(record)
+
+    def totals(self):
+        """
+        단계 이름별 합계(횟수, wall_s, cpu_s, bytes)를 반환합니다.
+
+        :rtype: dict
+        """
+        totals = {}
+        with self._lock:
+            for record in self.stages:
+                total = totals.setdefault(record['name'], dict(count=0, wall_s=0.0, cpu_s=0.0, bytes=0))
+                total['count'] += 1
+                total['wall_s'] += record['wall_s']
+                total['cpu_s'] += record['cpu_s']
+                total['bytes'] += record['bytes'] or 0
+        return totals
+
+    def to_dict(self):
+        with self._lock:
+            stages = list(self.stages)
+        return dict(job=self.name, memory=self.memory, started=self.started, stages=stages, totals=self.totals())
+
+    def to_json(self, indent=2):
+        return json.dumps(self.to_dict(), indent=indent, ensure_ascii=False)
+
+    def save(self, path):
+        """
+        보고서를 JSON 파일로 저장합니다.
+
+        :param path: 저장할 파일 경로
+        :type path: str
+        :return: path
+        :rtype: str
+        """
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(self.to_json())
+        return path
+
+
+@contextlib.contextmanager
+def job(name, memory=None):
+    """
+    with 블록 안에서 실행한 단계들을 JobReport에 모읍니다.
+    블록이 끝나면 보고서를 INFO 로그로 남깁니다.
+
+    :param name: 작업 이름
+    :type name: str
+    :param memory: 'tracemalloc'이면 tracemalloc으로 단계별 최대 메모리 사용량을, 'rss'이면 RSS 변화를 기록
+                   (기본값: tracemalloc이 이미 켜져 있으면 'tracemalloc', 아니면 'rss')
+    :type memory: str
+    :return: 작업 보고서
+    :rtype: JobReport
+    """
+    if memory is None:
+        memory = 'tracemalloc' if tracemalloc.is_tracing() else 'rss'
+    if memory not in ('tracemalloc', 'rss'):
+        raise ValueError(f"memory는 'tracemalloc' 또는 'rss'이어야 합니다: {memory}")
+
+    started_tracing = memory == 'tracemalloc' and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    report = JobReport(name, memory)
+    token = _job.set(report)
+    try:
+        yield report
+    finally:
+        _job.reset(token)
+        if started_tracing:
+            tracemalloc.stop()
+        logger.info("job %s: %s", name, json.dumps(report.totals(), ensure_ascii=False))
+
+
+def current_job():
+    """ 실행 중인 JobReport (job 밖이면 None) """
+    return _job.get()
+
+
+class stage:
+    """
+    with stage(name, data) as s: 로 감싼 구간을 계측합니다.
+    결과 배열은 s.output(result)로 알려주며, 끝나면 record를 DEBUG 로그로 남기고 실행 중인 JobReport에 추가합니다.
+
+    record 항목: name, parent, wall_s, cpu_s(프로세스 전체 CPU 시간), peak_bytes(tracemalloc),
+    rss_delta_bytes(RSS), input_shape, input_dtype, output_shape, output_dtype, bytes와 extra 항목들
+
+    :param name: 단계 이름 (예: 'read', 'align', 'filter.las')
+    :type name: str
+    :param data: 입력 배열
+    :type data: numpy.ndarray
+    :param nbytes: 처리한 바이트 수 (기본값: 입력 배열의 바이트 수, 끝나기 전에 s.nbytes로 바꿀 수 있음)
+    :type nbytes: int
+    :param extra: record에 함께 기록할 값들
+    """
+    def __init__(self, name, data=None, nbytes=None, **extra):
+        self.name = name
+        self.extra = extra
+        self.record = None
+        self.nbytes = nbytes
+        self._input = _describe(data)
+        self._output = None
+
+    def output(self, data):
+        """
+        결과 배열을 기록하고 그대로 돌려줍니다.
+        """
+        self._output = _describe(data)
+        return data
+
+    def __enter__(self):
+        self._parent = _stage.get()
+        self._token = _stage.set(self)
+        report = _job.get()
+        self._tracing = tracemalloc.is_tracing() and (report is None or report.memory == 'tracemalloc')
+        if self._tracing:
+            current, peak = tracemalloc.get_traced_memory()
+            if self._parent is not None:
+                self._parent._peak = max(self._parent._peak, peak)
+            # 이 단계의 최대 사용량만 보도록 초기화 (상위 단계에는 끝날 때 전달)
+            tracemalloc.reset_peak()
+            self._start_memory = self._peak = current
+        else:
+            self._start_memory = _rss()
+        self._wall = time.perf_counter()
+        self._cpu = time.process_time()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        wall = time.perf_counter() - self._wall
+        cpu = time.process_time() - self._cpu
+        _stage.reset(self._token)
+
+        peak, rss_delta = None, None
+        if self._tracing and tracemalloc.is_tracing():
+            self._peak = max(self._peak, tracemalloc.get_traced_memory()[1])
+            if self._parent is not None:
+                self._parent._peak = max(self._parent._peak, self._peak)
+            peak = self._peak - self._start_memory
+        elif not self._tracing and self._start_memory is not None:
+            rss_delta = _rss() - self._start_memory
+
+        nbytes = self.nbytes
+        if nbytes is None and self._input is not None:
+            nbytes = self._input[2]
+        self.record = dict(
+            name=self.name,
+            parent=None if self._parent is None else self._parent.name,
+            wall_s=wall, cpu_s=cpu, peak_bytes=peak, rss_delta_bytes=rss_delta,
+            input_shape=None if self._input is None else self._input[0],
+            input_dtype=None if self._input is None else self._input[1],
+            output_shape=None if self._output is None else self._output[0],
+            output_dtype=None if self._output is None else self._output[1],
+            bytes=nbytes, error=None if exc_type is None else exc_type.__name__,
+            **self.extra)
+
+        report = _job.get()
+        if report is not None:
+            report.add(self.record)
+        logger.debug("stage %s: %.3f s wall, %.3f s cpu, %s bytes",
+                     self.name, wall, cpu, nbytes, extra=dict(stage=self.record))
+        return False
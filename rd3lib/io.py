@@ -1,10 +1,17 @@
 '''
 rd3, rad 파일 읽기 등 I/O 관련 함수
 '''
+import functools
+import logging
 import numpy as np
 import os
-import matplotlib.pyplot as plt
-from rd3lib.utils import normalize_minmax, upscale_image
+from types import MappingProxyType
+from typing import Mapping, NamedTuple, Tuple
+from rd3lib.encoders import get_encoder
+from rd3lib.instrument import stage
+from rd3lib.utils import render_slice
+
+logger = logging.getLogger(__name__)
 
 
 def readRd3(path, filename):
@@ -18,35 +25,65 @@ def readRd3(path, filename):
     :return: 1차원 NumPy 배열 형태의 신호 데이터
     :rtype: numpy.ndarray
     """
-    with open(os.path.join(path, filename), "rb") as f:
-        data = f.read()
-    rd3_data = np.frombuffer(data, dtype=np.short)
-    return rd3_data
+    rd3_path = os.path.join(path, filename)
+    with stage('read', nbytes=os.path.getsize(rd3_path), file=filename) as s:
+        with open(rd3_path, "rb") as f:
+            data = f.read()
+        rd3_data = np.frombuffer(data, dtype=np.short)
+        return s.output(rd3_data)
 
 
-def readRad(path, filename):
+def openRd3(path, filename):
     """
-    주어진 경로의 .rad 파일을 읽고, 텍스트 헤더 정보를 딕셔너리로 파싱한 후,
-    이어지는 바이너리 데이터를 NumPy 배열로 반환합니다.
+    .rd3 바이너리 파일을 np.memmap으로 열어 (채널, 깊이, 트레이스 수) 형태의 3차원 뷰로 반환합니다.
+
+    파일 내용을 메모리로 복사하지 않고 stride만 바꾼 뷰를 돌려주므로,
+    파일 크기와 관계없이 메모리 사용량이 일정하게 유지됩니다.
+    채널 수와 깊이는 .rad 헤더의 NUMBER_OF_CH, SAMPLES 값을 사용합니다.
 
     :param path: 파일이 저장된 폴더 경로
     :type path: str
-    :param filename: 확장자가 .rd3인 파일 이름 (rad 확장자로 자동 변환됨)
+    :param filename: 읽을 .rd3 파일명
     :type filename: str
-    :return: 헤더 정보를 담은 딕셔너리
-    :rtype: dict
+    :return: (채널, 깊이, 트레이스 수) 형태의 읽기 전용 3차원 뷰
+    :rtype: numpy.ndarray
     """
-    nameRad = filename[:-3] + "rad"
-    with open(os.path.join(path, nameRad), "rb") as f:
-        data = f.read()
+    header = readRadHeader(path, filename)
+    ch = header.ch or 25
+    samples = header.samples or 256
+
+    rd3_path = os.path.join(path, filename)
+    trace_bytes = ch * samples * np.dtype(np.int16).itemsize
+    trace_count = os.path.getsize(rd3_path) // trace_bytes
 
+    # memmap은 실제로 읽는 단계(align 등)에서 디스크를 읽으므로 여기서는 파일 크기만 기록
+    with stage('read', nbytes=os.path.getsize(rd3_path), file=filename, memmap=True) as s:
+        raw = np.memmap(rd3_path, dtype=np.int16, mode="r", shape=(trace_count, ch, samples))
+        return s.output(raw.transpose(1, 2, 0))
+
+
+class RadHeader(NamedTuple):
+    """
+    .rad 헤더에서 파이프라인이 사용하는 값을 타입별로 담은 객체.
+    info에는 헤더 전체가 읽기 전용 딕셔너리로 들어 있습니다.
+    """
+    samples: int
+    ch: int
+    ch_x_offsets: Tuple[float, ...]
+    ch_y_offsets: Tuple[float, ...]
+    distance_interval: float
+    time_window: float
+    last_trace: int
+    info: Mapping[str, str]
+
+
+def _parseRadInfo(data):
     decoded_rad = data.decode("utf-8", errors="ignore")
 
     lines = decoded_rad.splitlines()
     list_rad = [line.strip().replace("'", "\"") for line in lines]
 
     infoDict = {}
-    header_byte_len = 0
 
     for line in list_rad:
         if ':' not in line:
@@ -56,11 +93,61 @@ def readRad(path, filename):
         value = line[colonIdx + 1:].strip()
         infoDict[key] = value
 
-        header_byte_len += len((line + "\n").encode("utf-8"))
-
     return infoDict
 
 
+@functools.lru_cache(maxsize=4096)
+def _loadRadHeader(rad_path, mtime_ns, size):
+    # mtime_ns, size는 캐시 키로만 사용 (파일이 바뀌면 새로 파싱)
+    with open(rad_path, "rb") as f:
+        infoDict = _parseRadInfo(f.read())
+
+    return RadHeader(
+        samples=int(infoDict.get("SAMPLES", "0") or 0),
+        ch=int(infoDict.get("NUMBER_OF_CH", "0") or 0),
+        ch_x_offsets=tuple(float(x) for x in infoDict.get("CH_X_OFFSETS", "").split()),
+        ch_y_offsets=tuple(float(x) for x in infoDict.get("CH_Y_OFFSETS", "").split()),
+        distance_interval=float(infoDict.get("DISTANCE INTERVAL", "0") or 0),
+        time_window=float(infoDict.get("TIMEWINDOW", "0") or 0),
+        last_trace=int(infoDict.get("LAST TRACE", "0") or 0),
+        info=MappingProxyType(infoDict),
+    )
+
+
+def readRadHeader(path, filename):
+    """
+    .rad 헤더를 읽어 RadHeader로 반환합니다.
+
+    파싱 결과는 (경로, 수정 시각, 파일 크기)를 키로 프로세스 전체에서 캐시하므로,
+    같은 파일을 여러 단계나 여러 요청에서 읽어도 헤더는 한 번만 파싱합니다.
+    파일이 바뀌면 수정 시각이나 크기가 달라져 다시 읽습니다.
+
+    :param path: 파일이 저장된 폴더 경로
+    :type path: str
+    :param filename: .rd3 또는 .rad 파일명 (확장자는 .rad로 바뀌어 사용됨)
+    :type filename: str
+    :return: 파싱된 헤더
+    :rtype: RadHeader
+    """
+    rad_path = os.path.abspath(os.path.join(path, os.path.splitext(str(filename))[0] + ".rad"))
+    stat = os.stat(rad_path)
+    return _loadRadHeader(rad_path, stat.st_mtime_ns, stat.st_size)
+
+
+def readRad(path, filename):
+    """
+    주어진 경로의 .rad 파일을 읽고, 텍스트 헤더 정보를 딕셔너리로 파싱하여 반환합니다.
+
+    :param path: 파일이 저장된 폴더 경로
+    :type path: str
+    :param filename: 확장자가 .rd3인 파일 이름 (rad 확장자로 자동 변환됨)
+    :type filename: str
+    :return: 헤더 정보를 담은 딕셔너리
+    :rtype: dict
+    """
+    return dict(readRadHeader(path, filename).info)
+
+
 def extractionRad(path, filename):
     """
     지정된 .rad 파일에서 CH_Y_OFFSETS, DISTANCE INTERVAL, NUMBER_OF_CH 값을 추출하여 반환합니다.
@@ -76,38 +163,51 @@ def extractionRad(path, filename):
     :return: 채널 개수 (NUMBER_OF_CH)
     :rtype: int
     """
-    filename = str(filename)
-    radname = filename[:-4] + ".rad"
-    infoDict = readRad(path, radname)
+    header = readRadHeader(path, filename)
+    return list(header.ch_y_offsets), header.distance_interval, header.ch
 
-    chOffsets_str = infoDict.get("CH_Y_OFFSETS", "")
-    distance_interval_str = infoDict.get("DISTANCE INTERVAL", "0")
-    ch_str = infoDict.get("NUMBER_OF_CH", "0")
 
-    chOffsets = [float(x) for x in chOffsets_str.split()]
-    distance_interval = float(distance_interval_str)
-    ch = int(ch_str)
+_AXES_FRACTION = (0.775, 0.77)  # matplotlib 기본 subplot 영역 비율 (right - left, top - bottom)
 
-    return chOffsets, distance_interval, ch
+
+def figure_pixels(figsize, dpi=100):
+    """
+    figsize, dpi의 matplotlib figure에서 축을 끄고 bbox_inches='tight', pad_inches=0으로
+    저장했을 때의 이미지 크기(축 영역)를 반환합니다.
+
+    :param figsize: (가로, 세로) 인치
+    :type figsize: tuple[float, float]
+    :param dpi: 인치당 픽셀 수
+    :type dpi: int
+    :return: (가로, 세로) 픽셀
+    :rtype: tuple[int, int]
+    """
+    return tuple(int(round(inches * dpi * fraction, 6)) for inches, fraction in zip(figsize, _AXES_FRACTION))
 
 
-def image_save(npdata, filename, number, depth=30):
+def image_save(npdata, filename, number, depth=30, savepath="./results", colormap=None, encoder=None):
     """
-    RD3 3차원 데이터를 슬라이스하여 정규화 및 업스케일 후,
+    RD3 3차원 데이터를 슬라이스하여 정규화 및 크기 변환 후,
     각 축에 대한 특정 인덱스 슬라이스 이미지를 저장합니다.
 
     슬라이스 방향은 (0,1), (1,2), (0,2) 축 기준으로 하며,
-    각 슬라이스에 대해 min-max 정규화와 업스케일을 수행한 뒤
-    Grayscale 이미지로 저장됩니다.
+    각 슬라이스는 render_slice로 figsize에 해당하는 픽셀 크기(figure_pixels)의
+    Grayscale 이미지로 만들어 PIL로 바로 저장됩니다. (matplotlib를 사용하지 않음)
+    저장 형식과 압축은 encoder로 정하며 파일 확장자도 encoder를 따릅니다.
 
     :param npdata: 3차원 GPR 데이터 (RD3에서 읽은 NumPy 배열)
     :type npdata: numpy.ndarray
-    :param savepath: 이미지 저장 경로 (폴더)
+    :param savepath: 이미지 저장 경로 (폴더, 기본값: ./results)
     :type savepath: str
-
+    :param colormap: RGB 이미지로 저장할 colormap (render_slice 참고, 기본값: grayscale)
+    :type colormap: str or numpy.ndarray
+    :param encoder: 이미지 인코더 또는 프리셋 이름 (rd3lib.encoders 참고, 기본값: 'png')
+    :type encoder: str or rd3lib.encoders.ImageEncoder
+    :return: 저장한 이미지 파일 경로들
+    :rtype: list[str]
     """
-    savepath = "./results"
     name = filename.split('.')[0]
+    encoder = get_encoder(encoder)
     # 데이터가 3차원인지 확인
     if npdata.ndim != 3:
         raise ValueError("입력 데이터는 반드시 3차원이어야 합니다.")
@@ -120,24 +220,24 @@ def image_save(npdata, filename, number, depth=30):
         (f"{name}_횡단면_axis2", 100, lambda i: npdata[:, :, i].T, npdata.shape[2], (3.0, 8.0)),
     ]  # name,       savepoint,     slicer,              max_index,       figsize
 
-    for name, savepoint, slicer, max_index, figsize in slice_configs:
-        slice_data = slicer(savepoint)
-        norm_img = normalize_minmax(slice_data, vmin=-3000, vmax=3000)
-        upscaled = upscale_image(norm_img, scale=4)
+    paths = []
+    with stage('render', npdata, file=filename, number=number, encoder=encoder.name):
+        for name, savepoint, slicer, max_index, figsize in slice_configs:
+            img = render_slice(slicer(savepoint), figure_pixels(figsize), vmin=-3000, vmax=3000, colormap=colormap)
+            paths.append(encoder.save(img, os.path.join(savepath, f"{name}_{number}.{encoder.extension}")))
 
-        fig = plt.figure(figsize=figsize, dpi=100)
-        plt.imshow(upscaled, cmap="gray", aspect='auto')
-        plt.axis('off')
-        fig.savefig(os.path.join(savepath, f"{name}_{number}.png"), bbox_inches='tight', pad_inches=0)
-        plt.close(fig)
+    logger.info("슬라이스 이미지가 '%s' 디렉토리에 저장되었습니다.", savepath)
+    return paths
 
-    print(f"슬라이스 이미지가 '{savepath}' 디렉토리에 저장되었습니다.")
 
-
-def road_image_save(road_image, BASENAME, chunk_list):
+def road_image_save(road_image, BASENAME, chunk_list, savepath="results", encoder=None):
     name = BASENAME.split('.')[0]
-    for n in range(len(chunk_list)):
-        start, end = chunk_list[n]
-        road_image.crop((start, 0, end, 80)).save(f"results/{name}_도로면_{n}.png", format='PNG')
+    encoder = get_encoder(encoder)
+    os.makedirs(savepath, exist_ok=True)
+    with stage('render_road', file=BASENAME, chunks=len(chunk_list), encoder=encoder.name):
+        for n in range(len(chunk_list)):
+            start, end = chunk_list[n]
+            path = os.path.join(savepath, f"{name}_도로면_{n}.{encoder.extension}")
+            encoder.save(road_image.crop((start, 0, end, 80)), path)
 
-    print(f"이미지 저장 완료: ./results/{name}_도로면_{n}.png")
+    logger.info("이미지 저장 완료: %s", path)
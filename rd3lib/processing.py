@@ -2,27 +2,51 @@
 데이터 전처리 및 slicing, filtering 등을 담당하는 모듈
 '''
 
+import logging
 import numpy as np
+from typing import NamedTuple
+from rd3lib.instrument import stage
 from rd3lib.io import extractionRad
+from rd3lib.utils import trace_mean, TRACE_CHUNK
 
-def reshapeRd3(raw_rd3):
+logger = logging.getLogger(__name__)
+
+def reshapeRd3(raw_rd3, ch=25, samples=256, layout="channel"):
     """
-    1차원 GPR 바이너리 데이터를 (채널, 깊이, 트레이스 수) 형태의 3차원 배열로 변환합니다.
-    내부적으로 reshape 및 transpose 과정을 통해 RD3 데이터를 재구성합니다.
+    1차원 GPR 바이너리 데이터를 3차원 배열로 변환합니다.
+
+    .rd3 파일은 트레이스마다 (채널, 깊이) 순서로 저장되어 있으므로,
+    layout="channel"이면 transpose 복사로 (채널, 깊이, 트레이스 수) 배열을 만들고,
+    layout="trace"이면 복사 없이 원래 순서인 (트레이스 수, 채널, 깊이) 뷰를 반환합니다.
+    transpose 복사는 캐시에 들어가는 TRACE_CHUNK 트레이스 단위로 나누어 수행합니다.
 
     :param raw_rd3: 1차원으로 읽은 RD3 원본 GPR 데이터
     :type raw_rd3: numpy.ndarray
-    :return: (채널, 깊이, 트레이스 수)의 형태로 재배열된 3차원 GPR 데이터
+    :param ch: 채널 수 (NUMBER_OF_CH)
+    :type ch: int
+    :param samples: 트레이스당 깊이 샘플 수 (SAMPLES)
+    :type samples: int
+    :param layout: "channel"(채널, 깊이, 트레이스) 또는 "trace"(트레이스, 채널, 깊이)
+    :type layout: str
+    :return: layout에 따라 재배열된 3차원 GPR 데이터
     :rtype: numpy.ndarray
     """
-    trace_count = len(raw_rd3) // (25 * 256)
-    gpr = raw_rd3.reshape(trace_count, 25, 256)
+    if layout not in ("channel", "trace"):
+        raise ValueError("layout은 'channel' 또는 'trace'여야 합니다.")
+
+    trace_count = len(raw_rd3) // (ch * samples)
+    gpr = raw_rd3[:trace_count * ch * samples].reshape(trace_count, ch, samples)
 
-    gpr_reshaped = np.zeros((25, 256, trace_count), dtype=np.int16)
-    for ch in range(25):
-        gpr_reshaped[ch] = gpr[:, ch, :].T
+    if layout == "trace":
+        return gpr
 
-    return gpr_reshaped
+    with stage('reshape', raw_rd3) as s:
+        gpr_reshaped = np.empty((ch, samples, trace_count), dtype=np.int16)
+        for start in range(0, trace_count, TRACE_CHUNK):
+            stop = start + TRACE_CHUNK
+            gpr_reshaped[:, :, start:stop] = gpr[start:stop].transpose(1, 2, 0)
+
+        return s.output(gpr_reshaped)
 
 def cutRd3(rd3, start_m, length_m, path, filename):
     """
@@ -43,7 +67,7 @@ def cutRd3(rd3, start_m, length_m, path, filename):
     length = round(length_m / distance_interval)
     end_idx = min(start_idx + length, rd3.shape[2])
 
-    print(f"[거리 {start_m}m ~ {start_m + length_m}m] → 인덱스 {start_idx} ~ {start_idx + length}")
+    logger.debug("[거리 %sm ~ %sm] → 인덱스 %s ~ %s", start_m, start_m + length_m, start_idx, start_idx + length)
 
     return rd3[:, :, start_idx:end_idx]
 
@@ -54,49 +78,138 @@ def cut_200m(rd3, chunk_list):
         rd3list.append(rd3[:, :, start:end])
     return rd3list
 
+class GroundDetection(NamedTuple):
+    """
+    detect_ground 결과. 찾지 못한 위치는 -1 입니다.
+    """
+    signal_avgs: np.ndarray  # (채널 수, 깊이) 채널별 평균 신호
+    min_idx: np.ndarray  # 첫 음의 극소 위치
+    max_idx: np.ndarray  # 그 뒤 첫 양의 극대 위치
+    factors: np.ndarray  # alignSignal 채널 정규화 계수
+    ground_idx: np.ndarray  # alignSignal 적용 후 신호 기준 ground index
+
+
+def find_min_max(signals, neg_thresh=-1000, pos_thresh=1000):
+    """
+    (채널 수, 깊이) 신호에서 채널별 첫 음의 극소 / 그 뒤 첫 양의 극대 위치를 배열 연산으로 찾습니다.
+    detect_min_max를 모든 채널에 한 번에 적용한 것과 같고, 찾지 못한 위치는 -1 입니다.
+
+    :param signals: (채널 수, 깊이) 또는 (깊이,) 형태의 평균 신호
+    :type signals: numpy.ndarray
+    :return: 채널별 (최소값 위치, 최대값 위치)
+    :rtype: tuple[numpy.ndarray, numpy.ndarray]
+    """
+    signals = np.atleast_2d(signals)
+    head, slope = signals[:, :-1], np.diff(signals, axis=1)
+    positions = np.arange(head.shape[1])
+
+    is_min = (head < neg_thresh) & (slope > 0)
+    has_min = is_min.any(axis=1)
+    min_idx = np.where(has_min, is_min.argmax(axis=1), -1)
+
+    is_max = (head > pos_thresh) & (slope < 0) & (positions > min_idx[:, None]) & has_min[:, None]
+    has_max = is_max.any(axis=1)
+    max_idx = np.where(has_max, is_max.argmax(axis=1), -1)
+
+    return min_idx, max_idx
+
+
+def _ground_index(signals, min_idx, max_idx, fallback=10):
+    """
+    min_idx ~ max_idx 사이 첫 양수 위치와 구간 중간의 평균으로 ground index를 계산합니다.
+    """
+    signals = np.atleast_2d(signals)
+    positions = np.arange(signals.shape[1])
+    found = (min_idx >= 0) & (max_idx >= 0)
+
+    in_range = (positions >= min_idx[:, None]) & (positions <= max_idx[:, None])
+    first_positive = ((signals > 0) & in_range).argmax(axis=1)
+    ground_idx = np.round((first_positive + (min_idx + max_idx) / 2) / 2).astype(int)
+
+    return np.where(found, ground_idx, fallback)
+
+
 def detect_min_max(signal, neg_thresh=-1000, pos_thresh=1000):
     """
     하나의 채널 평균 신호에서 최소/최대값 위치 반환
     alignGround에 사용하는 함수
     """
-    min_idx = max_idx = None
-    for i in range(len(signal) - 1):
-        if min_idx is None and signal[i] < neg_thresh and signal[i+1] - signal[i] > 0:
-            min_idx = i
-        if min_idx is not None and signal[i] > pos_thresh and signal[i+1] - signal[i] < 0:
-            max_idx = i
-            break
-    return min_idx, max_idx
+    min_idx, max_idx = find_min_max(signal, neg_thresh, pos_thresh)
+    return (None if min_idx[0] < 0 else int(min_idx[0]),
+            None if max_idx[0] < 0 else int(max_idx[0]))
+
+def signal_factors(signal_avgs, min_idx=None, max_idx=None):
+    """
+    채널별 평균 신호에서 지표면 반사의 최소/최대값을 찾아 채널 정규화 계수를 계산합니다.
+
+    :param signal_avgs: (채널 수, 깊이) 형태의 채널별 평균 신호
+    :type signal_avgs: numpy.ndarray
+    :return: 채널별 정규화 계수
+    :rtype: numpy.ndarray
+    """
+    if min_idx is None or max_idx is None:
+        min_idx, max_idx = find_min_max(signal_avgs)
+
+    found = (min_idx >= 0) & (max_idx >= 0)
+    channels = np.arange(len(signal_avgs))
+    # fallback 처리
+    mins = np.where(found, signal_avgs[channels, min_idx], -1000)
+    maxs = np.where(found, signal_avgs[channels, max_idx], 1000)
+
+    ranges = maxs - mins
+    return np.sqrt(ranges.max() / ranges)
+
+def detect_ground(gpr_data, ch, depth=256):
+    """
+    채널별 평균 트레이스를 한 번만 계산하여 alignSignal과 alignGround가 함께 쓸 탐지 결과를 만듭니다.
+
+    채널 평균은 트레이스 방향 한 번의 reduction으로 구하고,
+    모든 채널의 최소/최대값 위치를 배열 연산으로 동시에 찾습니다.
+    alignGround용 ground index는 정규화 계수를 곱한 평균 신호에서 찾으므로,
+    alignSignal 결과의 평균을 다시 계산한 것과 같습니다.
+
+    :param gpr_data: (채널 수, 깊이, 거리) 형태의 GPR 데이터 3차원 배열
+    :type gpr_data: numpy.ndarray
+    :param ch: 채널 수
+    :type ch: int
+    :param depth: 탐지에 사용할 깊이 샘플 수
+    :type depth: int
+    :return: 탐지 결과
+    :rtype: GroundDetection
+    """
+    return ground_detection(trace_mean(gpr_data[:ch, :depth, :]))
 
-def alignSignal(gpr_data, ch, depth=256):
+def ground_detection(signal_avgs):
+    """
+    채널별 평균 신호로 GroundDetection을 만듭니다. (detect_ground 참고)
+
+    :param signal_avgs: (채널 수, 깊이) 형태의 채널별 평균 신호
+    :type signal_avgs: numpy.ndarray
+    :return: 탐지 결과
+    :rtype: GroundDetection
+    """
+    min_idx, max_idx = find_min_max(signal_avgs)
+    factors = signal_factors(signal_avgs, min_idx, max_idx)
+    ground_idx = ground_indices(signal_avgs * factors[:, None])
+    return GroundDetection(signal_avgs, min_idx, max_idx, factors, ground_idx)
+
+def alignSignal(gpr_data, ch, depth=256, detection=None):
     """
     GPR 데이터를 채널 간 정렬 및 정규화하는 함수
 
     :param path: .rad 파일이 존재하는 디렉토리 경로, 문자열(str) 형식
     :param filename: 처리 대상 .rd3 파일 이름, 문자열(str) 형식
     :param gpr_data: (채널 수, 깊이, 거리) 형태의 GPR 데이터 3차원 배열 (np.ndarray)
+    :param detection: detect_ground 결과 (없으면 gpr_data에서 계산)
 
     :return gpr_normalized: 채널 간 정규화가 적용된 GPR 데이터 3차원 배열 (np.ndarray)
     """
-    mins, maxs = [], []
-
     # 1단계: 채널별 ground 평균 계산 후 min/max 탐지
-    for i in range(ch):
-        signal_avg = np.mean(gpr_data[i, :depth, :], axis=1)
-        min_idx, max_idx = detect_min_max(signal_avg)
-        if min_idx is not None and max_idx is not None:
-            mins.append(signal_avg[min_idx])
-            maxs.append(signal_avg[max_idx])
-        else:
-            # fallback 처리
-            mins.append(-1000)
-            maxs.append(1000)
-
-    ranges = np.array(maxs) - np.array(mins)
-    factors = np.sqrt(ranges.max() / ranges)
+    if detection is None:
+        detection = detect_ground(gpr_data, ch, depth)
 
     # 2단계: 채널별 정규화
-    gpr_normalized = gpr_data * factors[:, None, None]
+    gpr_normalized = gpr_data * detection.factors[:, None, None]
     return gpr_normalized
 
 
@@ -105,20 +218,45 @@ def detect_ground_index(signal, neg_thresh=-1000, pos_thresh=1000):
     평균 신호에서 지표면 범위를 찾아 중간 ground index 반환
     alignGround에 사용하는 함수
     """
-    min_idx = max_idx = None
-    for i in range(len(signal) - 1):
-        if min_idx is None and signal[i] < neg_thresh and signal[i+1] - signal[i] > 0:
-            min_idx = i
-        if min_idx is not None and signal[i] > pos_thresh and signal[i+1] - signal[i] < 0:
-            max_idx = i
-            break
-    if min_idx is not None and max_idx is not None:
-        for i in range(min_idx, max_idx + 1):
-            if signal[i] > 0:
-                return round((i + (min_idx + max_idx) / 2) / 2)
-    return 10  # fallback index
-
-def alignGround(gpr_data, ch, depth=256, pad=10):
+    min_idx, max_idx = find_min_max(signal, neg_thresh, pos_thresh)
+    return int(_ground_index(signal, min_idx, max_idx)[0])
+
+def ground_indices(signal_avgs):
+    """
+    채널별 평균 신호에서 지표면 ground index를 찾아 배열로 반환합니다.
+
+    :param signal_avgs: (채널 수, 깊이) 형태의 채널별 평균 신호
+    :type signal_avgs: numpy.ndarray
+    :return: 채널별 ground index
+    :rtype: numpy.ndarray
+    """
+    signals = signal_avgs.astype(np.int32)
+    min_idx, max_idx = find_min_max(signals)
+    return _ground_index(signals, min_idx, max_idx)
+
+def shift_ground(gpr_data, ground_idx, depth=256, pad=10):
+    """
+    채널별 ground index가 pad 위치에 오도록 깊이 방향으로 데이터를 끌어올립니다.
+
+    :param gpr_data: (채널 수, 깊이, 거리) 형태의 GPR 데이터 3차원 배열
+    :type gpr_data: numpy.ndarray
+    :param ground_idx: 채널별 ground index
+    :type ground_idx: list[int]
+    :return: 지표면을 기준으로 정렬된 GPR 데이터
+    :rtype: numpy.ndarray
+    """
+    ground_aligned = np.zeros_like(gpr_data)
+
+    for i, idx in enumerate(ground_idx):
+        start = max(idx - pad, 0)
+        end = depth
+        length = end - start
+
+        ground_aligned[i, :length, :] = gpr_data[i, start:end, :]
+
+    return ground_aligned
+
+def alignGround(gpr_data, ch, depth=256, pad=10, detection=None):
     """
     각 채널마다 지표면의 반사 위치가 서로 다를 수 있기 때문에,
     GPR 데이터에서 지표면(ground)을 기준으로 정렬한 결과를 반환해주는 함수
@@ -126,23 +264,58 @@ def alignGround(gpr_data, ch, depth=256, pad=10):
     :param path: .rad 파일이 존재하는 디렉토리 경로, 문자열(str) 형식
     :param filename: 처리 대상 .rd3 파일 이름, 문자열(str) 형식
     :param gpr_data: (채널 수, 깊이, 거리) 형태의 GPR 데이터 3차원 배열 (np.ndarray)
+    :param detection: alignSignal에 사용한 detect_ground 결과 (없으면 gpr_data에서 계산)
 
     :return gpr_reshaped2: 지표면을 기준으로 정렬된 GPR 데이터 (np.ndarray), shape = (채널 수, 256, 거리 수)
     """
-    ground_aligned = np.zeros_like(gpr_data)
+    if detection is None:
+        ground_idx = ground_indices(trace_mean(gpr_data[:ch, :depth, :]))
+    else:
+        ground_idx = detection.ground_idx
+    return shift_ground(gpr_data, ground_idx, depth, pad)
 
-    for i in range(ch):
-        signal_avg = np.mean(gpr_data[i, :depth, :], axis=1)
-        signal_avg = signal_avg.astype(np.int32)
-        ground_idx = detect_ground_index(signal_avg)
+def channel_shifts(ch_offsets, distance_interval):
+    """
+    채널 오프셋을 가장 가까운 채널 기준의 트레이스 이동량(픽셀)으로 변환합니다.
+
+    :param ch_offsets: 채널별 진행 방향 오프셋 (CH_Y_OFFSETS)
+    :type ch_offsets: list[float]
+    :param distance_interval: 트레이스 간 거리 간격
+    :type distance_interval: float
+    :return: 채널별 트레이스 이동량
+    :rtype: list[int]
+    """
+    offsets = np.array(ch_offsets) - np.min(ch_offsets)  # 가장 가까운 채널을 기준으로 정렬
+    return [int(offset / distance_interval) for offset in offsets]
 
-        start = max(ground_idx - pad, 0)
-        end = depth
-        length = end - start
+def shift_channels(gpr_data, shifts, fill_values, first=0):
+    """
+    채널별로 트레이스 방향 이동을 적용하고, 측선 앞쪽의 빈 공간을 fill_values로 채웁니다.
+
+    :param gpr_data: (채널 수, 깊이, 거리) 형태의 GPR 데이터 3차원 배열
+    :type gpr_data: numpy.ndarray
+    :param shifts: 채널별 트레이스 이동량 (channel_shifts 결과)
+    :type shifts: list[int]
+    :param fill_values: 채널별 (깊이, 1) 형태의 채움값, 이동량이 0인 채널은 None
+    :type fill_values: list
+    :param first: gpr_data 첫 트레이스의 전역 트레이스 인덱스 (블록 처리 시 사용)
+    :type first: int
+    :return: 채널 간 수평 정렬이 적용된 GPR 데이터
+    :rtype: numpy.ndarray
+    """
+    gpr_aligned = np.copy(gpr_data)
 
-        ground_aligned[i, :length, :] = gpr_data[i, start:end, :]
+    for ch_idx, shift_px in enumerate(shifts):
+        if shift_px == 0:
+            continue
 
-    return ground_aligned
+        gpr_aligned[ch_idx, :, shift_px:] = gpr_data[ch_idx, :, :-shift_px]
+
+        # 앞쪽 빈 공간은 평균값으로 채움 (방향성 보존)
+        head = min(max(shift_px - first, 0), gpr_data.shape[2])
+        gpr_aligned[ch_idx, :, :head] = fill_values[ch_idx]
+
+    return gpr_aligned
 
 def alignChannel(gpr_data, ch_offsets, distance_interval):
     """
@@ -154,18 +327,121 @@ def alignChannel(gpr_data, ch_offsets, distance_interval):
 
     return gpr_reshaped2: 채널 간 수평 정렬이 적용된 GPR 데이터 (np.ndarray), shape = (채널 수, 256, 거리 수)
     """
-    offsets = np.array(ch_offsets) - np.min(ch_offsets)  # 가장 가까운 채널을 기준으로 정렬
-    gpr_aligned = np.copy(gpr_data)
+    shifts = channel_shifts(ch_offsets, distance_interval)
+    trace_count = gpr_data.shape[2]
 
-    for ch_idx, offset in enumerate(offsets):
-        if offset == 0:
-            continue
+    fill_values = [None if shift_px == 0 else
+                   trace_mean(gpr_data[ch_idx, :, :trace_count - shift_px])[:, None]
+                   for ch_idx, shift_px in enumerate(shifts)]
 
-        shift_px = int(offset / distance_interval)
-        gpr_aligned[ch_idx, :, shift_px:] = gpr_data[ch_idx, :, :-shift_px]
+    return shift_channels(gpr_data, shifts, fill_values)
+
+def channel_fill_means(gpr_data, shifts):
+    """
+    alignChannel에서 측선 앞쪽 빈 공간을 채울 채널별 평균 트레이스를 계산합니다.
+    이동 후 남는 구간, 즉 입력의 [0, 트레이스 수 - 이동량) 평균이며 이동량이 0인 채널은 None 입니다.
+
+    :param gpr_data: (채널 수, 깊이, 거리) 형태의 GPR 데이터 3차원 배열
+    :type gpr_data: numpy.ndarray
+    :param shifts: 채널별 트레이스 이동량 (channel_shifts 결과)
+    :type shifts: list[int]
+    :return: 채널별 (깊이,) 평균 트레이스 리스트
+    :rtype: list
+    """
+    trace_count = gpr_data.shape[2]
+    return [None if shift_px == 0 or shift_px >= trace_count else
+            trace_mean(gpr_data[ch_idx, :, :trace_count - shift_px])
+            for ch_idx, shift_px in enumerate(shifts)]
+
+def fuse_align(gpr_data, detection, shifts, fill_means, depth=256, pad=10, dtype=np.float32, first=0, out=None):
+    """
+    alignSignal(채널 gain), alignGround(깊이 이동), alignChannel(트레이스 이동)을
+    미리 할당한 하나의 출력 배열에 한 번에 적용합니다.
+
+    채널마다 TRACE_CHUNK * 8 트레이스씩 float64로 계산한 뒤 출력 dtype으로 저장하므로
+    임시 메모리는 출력 크기와 관계없이 일정합니다.
+    int16 출력은 반올림 후 int16 범위로 포화(saturate)시킵니다.
+
+    :param gpr_data: (채널 수, 깊이, 거리) 형태의 원본 GPR 데이터 (np.memmap 뷰 가능)
+    :type gpr_data: numpy.ndarray
+    :param detection: 원본 데이터의 detect_ground 결과
+    :type detection: GroundDetection
+    :param shifts: 채널별 트레이스 이동량 (channel_shifts 결과)
+    :type shifts: list[int]
+    :param fill_means: 원본 데이터의 channel_fill_means 결과
+    :type fill_means: list
+    :param dtype: 출력 dtype (np.float32 또는 np.int16)
+    :type dtype: numpy.dtype
+    :param first: gpr_data 첫 트레이스의 전역 트레이스 인덱스 (블록 처리 시 사용)
+    :type first: int
+    :param out: 결과를 저장할 (채널 수, 깊이, 거리) 배열 (선택)
+    :type out: numpy.ndarray
+    :return: 정렬된 GPR 데이터
+    :rtype: numpy.ndarray
+    """
+    channels, _, trace_count = gpr_data.shape
+    if out is None:
+        out = np.empty(gpr_data.shape, dtype=dtype)
+    chunk = TRACE_CHUNK * 8
+
+    if np.issubdtype(out.dtype, np.integer):
+        info = np.iinfo(out.dtype)
+        store = lambda dst, src: np.copyto(dst, np.rint(np.clip(src, info.min, info.max, out=src), out=src),
+                                           casting='unsafe')
+    else:
+        store = lambda dst, src: np.copyto(dst, src, casting='same_kind')
+
+    for ch_idx in range(channels):
+        factor = detection.factors[ch_idx]
+        start = max(detection.ground_idx[ch_idx] - pad, 0)
+        length = depth - start
+        shift_px = min(shifts[ch_idx], trace_count)
+
+        out[ch_idx, length:, :] = 0
 
         # 앞쪽 빈 공간은 평균값으로 채움 (방향성 보존)
-        mean_values = np.mean(gpr_aligned[ch_idx, :, shift_px:], axis=1, keepdims=True)
-        gpr_aligned[ch_idx, :, :shift_px] = mean_values
+        if shift_px:
+            head = min(max(shift_px - first, 0), trace_count)
+            fill = fill_means[ch_idx][start:depth] * factor if fill_means[ch_idx] is not None else np.zeros(length)
+            store(out[ch_idx, :length, :shift_px], np.repeat(fill[:, None], shift_px, axis=1))
+            if head < shift_px:
+                # 블록 앞쪽 halo 중 이전 트레이스가 없는 구간 (결과에서 잘려나감)
+                out[ch_idx, :length, head:shift_px] = 0
+
+        for t0 in range(shift_px, trace_count, chunk):
+            t1 = min(t0 + chunk, trace_count)
+            scaled = gpr_data[ch_idx, start:depth, t0 - shift_px:t1 - shift_px] * factor
+            store(out[ch_idx, :length, t0:t1], scaled)
+
+    return out
+
+def align_volume(gpr_data, ch, ch_offsets, distance_interval, depth=256, pad=10, dtype=np.float32, detection=None):
+    """
+    alignSignal → alignGround → alignChannel 과정을 한 번의 패스로 수행하는 함수.
+
+    세 단계가 각각 전체 볼륨을 복사하고 float64로 커지는 대신,
+    원본(np.memmap 뷰 가능)에서 바로 읽어 하나의 float32 또는 int16 배열에 결과를 씁니다.
+    결과는 세 함수를 차례로 적용한 값을 dtype으로 변환한 것과 같습니다.
+
+    :param gpr_data: (채널 수, 깊이, 거리) 형태의 원본 GPR 데이터
+    :type gpr_data: numpy.ndarray
+    :param ch: 채널 수
+    :type ch: int
+    :param ch_offsets: 채널별 진행 방향 오프셋 (CH_Y_OFFSETS)
+    :type ch_offsets: list[float]
+    :param distance_interval: 트레이스 간 거리 간격
+    :type distance_interval: float
+    :param dtype: 출력 dtype (np.float32 또는 np.int16)
+    :type dtype: numpy.dtype
+    :param detection: detect_ground 결과 (없으면 gpr_data에서 계산)
+    :type detection: GroundDetection
+    :return: 정렬된 GPR 데이터, shape = (채널 수, 깊이, 거리 수)
+    :rtype: numpy.ndarray
+    """
+    with stage('align', gpr_data) as s:
+        if detection is None:
+            detection = detect_ground(gpr_data, ch, depth)
+        shifts = channel_shifts(ch_offsets, distance_interval)
+        fill_means = channel_fill_means(gpr_data, shifts)
 
-    return gpr_aligned
\ No newline at end of file
+        return s.output(fuse_align(gpr_data, detection, shifts, fill_means, depth, pad, dtype))
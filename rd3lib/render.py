@@ -0,0 +1,158 @@
+'''
+200m 구간 이미지 병렬 저장 모듈
+구간마다 슬라이스 이미지(image_save)와 도로면 이미지를 만들고 저장(인코딩)하는 작업을 프로세스 풀에 나누어 실행함
+
+전처리된 배열은 multiprocessing.shared_memory에 한 번만 올리고 작업 프로세스는 이름으로 붙어서 읽으므로
+구간마다 배열을 pickle로 넘기지 않음 (SharedArray 참고)
+    with SharedArray(shape, np.int16) as volume:
+        rd3_process(DIRNAME, BASENAME, out=volume.array)
+        paths = save_chunk_images(volume, BASENAME, chunk_list, workers=4)
+'''
+
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+from multiprocessing import shared_memory
+import os
+
+import numpy as np
+
+from rd3lib.encoders import get_encoder
+from rd3lib.instrument import stage
+from rd3lib.io import image_save
+
+# 작업 프로세스에서 붙은 공유 메모리 {이름: (SharedMemory, 배열)}
+_attached = {}
+# uvicorn처럼 이미 스레드가 있는 프로세스를 fork하면 교착될 수 있으므로 forkserver(없으면 spawn)로 작업 프로세스를 시작
+START_METHOD = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+
+
+class SharedArray:
+    """
+    multiprocessing.shared_memory에 만든 numpy 배열.
+    with 블록이 끝나면(또는 close()를 호출하면) 공유 메모리를 해제하므로, 그 뒤에는 array를 사용하면 안 됩니다.
+
+    :param shape: 배열 shape
+    :type shape: tuple
+    :param dtype: 배열 dtype
+    :type dtype: numpy.dtype
+    """
+    def __init__(self, shape, dtype=np.int16):
+        dtype = np.dtype(dtype)
+        shape = tuple(int(n) for n in shape)
+        self._shm = shared_memory.SharedMemory(create=True, size=max(int(np.prod(shape)) * dtype.itemsize, 1))
+        self.array = np.ndarray(shape, dtype=dtype, buffer=self._shm.buf)
+        # 작업 프로세스에 넘기는 값 (이름, shape, dtype)
+        self.spec = (self._shm.name, shape, dtype.str)
+
+    @classmethod
+    def copy_of(cls, data):
+        """ data를 복사한 SharedArray """
+        shared = cls(data.shape, data.dtype)
+        np.copyto(shared.array, data)
+        return shared
+
+    def close(self):
+        if self._shm is not None:
+            self.array = None
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+def _attach(spec):
+    # 작업 프로세스에서 SharedArray.spec으로 공유 배열에 붙음 (프로세스마다 한 번)
+    name, shape, dtype = spec
+    if name not in _attached:
+        shm = shared_memory.SharedMemory(name=name)
+        _attached[name] = (shm, np.ndarray(shape, dtype=dtype, buffer=shm.buf))
+    return _attached[name][1]
+
+
+def _render_chunk(volume, filename, number, start, end, depth, savepath, colormap, encoder, road=None):
+    # 구간 하나의 슬라이스 이미지와 도로면 이미지(road가 있으면)를 저장하고 경로들을 반환
+    if isinstance(volume, tuple):
+        volume = _attach(volume)
+    paths = image_save(volume[:, :, start:end], filename, number, depth=depth, savepath=savepath,
+                       colormap=colormap, encoder=encoder)
+    if road is not None:
+        name = filename.split('.')[0]
+        paths.append(encoder.save(road, os.path.join(savepath, f"{name}_도로면_{number}.{encoder.extension}")))
+    return paths
+
+
+def render_workers(workers=None, chunks=None):
+    """
+    렌더링에 사용할 프로세스 수.
+    workers가 없으면 RD3_RENDER_WORKERS 환경 변수, 그것도 없으면 CPU 수를 사용하며 구간 수보다 많지 않게 합니다.
+
+    :rtype: int
+    """
+    if workers is None:
+        workers = int(os.environ.get('RD3_RENDER_WORKERS', 0)) or os.cpu_count() or 1
+    if chunks is not None:
+        workers = min(workers, chunks)
+    return max(workers, 1)
+
+
+def save_chunk_images(rd3, filename, chunk_list, road_image=None, depth=30, savepath="./results",
+                      colormap=None, workers=None, encoder=None):
+    """
+    chunk_list의 구간마다 슬라이스 이미지(image_save)와 도로면 이미지를 저장합니다.
+    workers가 2 이상이면 구간들을 프로세스 풀에서 나누어 처리하며, 결과는 항상 구간 순서대로 돌려줍니다.
+
+    rd3가 SharedArray이면 그대로 공유하고, numpy 배열이면 공유 메모리에 한 번 복사한 뒤 작업 프로세스에서 붙어 읽습니다.
+    도로면 이미지는 부모 프로세스에서 구간별로 잘라(road_image_save와 같은 80픽셀 높이) 작업 프로세스에서 저장합니다.
+
+    :param rd3: 전처리된 (채널, 깊이, 트레이스) 배열
+    :type rd3: numpy.ndarray or SharedArray
+    :param filename: .rd3 파일명 (이미지 파일 이름에 사용)
+    :type filename: str
+    :param chunk_list: chunk_range 결과 ([start, end] 목록)
+    :type chunk_list: list
+    :param road_image: roadDrawing.makeImg 결과 (없으면 도로면 이미지는 저장하지 않음)
+    :type road_image: PIL.Image.Image
+    :param depth: 평단면 깊이 인덱스
+    :type depth: int
+    :param savepath: 이미지 저장 경로
+    :type savepath: str
+    :param colormap: 슬라이스 이미지 colormap (image_save 참고)
+    :type colormap: str or numpy.ndarray
+    :param workers: 프로세스 수 (render_workers 참고)
+    :type workers: int
+    :param encoder: 이미지 인코더 또는 프리셋 이름 (rd3lib.encoders 참고, 기본값: 'png')
+    :type encoder: str or rd3lib.encoders.ImageEncoder
+    :return: 구간별 저장한 이미지 경로들 (슬라이스 이미지 3개, 도로면 이미지)
+    :rtype: list[list[str]]
+    """
+    workers = render_workers(workers, len(chunk_list))
+    encoder = get_encoder(encoder)
+    data = rd3.array if isinstance(rd3, SharedArray) else np.asarray(rd3)
+    if data.ndim != 3:
+        raise ValueError("입력 데이터는 반드시 3차원이어야 합니다.")
+    roads = [None] * len(chunk_list)
+    if road_image is not None:
+        roads = [road_image.crop((start, 0, end, 80)) for start, end in chunk_list]
+
+    with stage('render_chunks', data, file=filename, chunks=len(chunk_list), workers=workers):
+        if workers == 1:
+            return [_render_chunk(data, filename, number, start, end, depth, savepath, colormap, encoder, road)
+                    for number, ((start, end), road) in enumerate(zip(chunk_list, roads))]
+
+        os.makedirs(savepath, exist_ok=True)
+        shared = rd3 if isinstance(rd3, SharedArray) else SharedArray.copy_of(data)
+        try:
+            with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context(START_METHOD)) as pool:
+                futures = [pool.submit(_render_chunk, shared.spec, filename, number, start, end,
+                                       depth, savepath, colormap, encoder, road)
+                           for number, ((start, end), road) in enumerate(zip(chunk_list, roads))]
+                return [future.result() for future in futures]
+        finally:
+            if shared is not rd3:
+                shared.close()
@@ -0,0 +1,211 @@
+'''
+긴 측선 데이터를 트레이스 블록 단위로 나누어 처리하는 스트리밍 모듈
+iter_trace_blocks로 halo(경계 중첩)가 붙은 블록을 만들고,
+rd3_process_stream을 사용하면 rd3_process와 같은 결과를 블록 단위로 돌려줌
+
+측선 전체 통계가 필요한 단계(align_volume의 지표면 탐지와 채움값,
+background, alingnSignal, ch_bias)는 블록 처리 전에 한 번 더 스트리밍하여 통계를 구하므로
+메모리 사용량은 블록 크기에만 비례함
+'''
+
+from collections import namedtuple
+import os
+
+import numpy as np
+
+from rd3lib.filter import load_filter_plan
+from rd3lib.io import openRd3, extractionRad
+from rd3lib.processing import ground_detection, channel_shifts, fuse_align
+from rd3lib.utils import TraceMean
+
+TraceBlock = namedtuple("TraceBlock", ["data", "start", "stop", "lead"])
+TraceBlock.__doc__ = """
+트레이스 블록. data는 halo가 포함된 (채널, 깊이, 트레이스) 배열이고,
+start/stop은 halo를 제외한 본 구간의 전역 트레이스 인덱스, lead는 앞쪽 halo 트레이스 수입니다.
+"""
+
+
+def iter_trace_blocks(volume, block_size=4096, halo=0):
+    """
+    (채널, 깊이, 트레이스) 배열을 트레이스 방향으로 block_size씩 잘라 halo를 붙여 돌려주는 제너레이터.
+    측선 양 끝에서는 halo가 잘립니다.
+
+    :param volume: (채널, 깊이, 트레이스) 형태의 3차원 배열 (np.memmap 뷰 가능)
+    :type volume: numpy.ndarray
+    :param block_size: 블록 하나의 본 구간 트레이스 수
+    :type block_size: int
+    :param halo: 블록 양쪽에 덧붙일 트레이스 수
+    :type halo: int
+    :return: TraceBlock 제너레이터
+    :rtype: Iterator[TraceBlock]
+    """
+    total = volume.shape[2]
+    for start in range(0, total, block_size):
+        stop = min(start + block_size, total)
+        lo = max(start - halo, 0)
+        hi = min(stop + halo, total)
+        yield TraceBlock(volume[:, :, lo:hi], start, stop, start - lo)
+
+
+def trim_halo(block):
+    """
+    블록에서 halo를 잘라내고 본 구간 데이터만 반환합니다.
+
+    :param block: halo가 포함된 블록
+    :type block: TraceBlock
+    :return: (채널, 깊이, stop - start) 형태의 배열
+    :rtype: numpy.ndarray
+    """
+    return block.data[:, :, block.lead:block.lead + block.stop - block.start]
+
+
+class Stage:
+    """
+    스트리밍 파이프라인의 한 단계.
+
+    halo는 블록 경계 양쪽에 필요한 트레이스 수,
+    needs_fit이 True이면 apply 전에 fit으로 측선 전체 통계를 구해야 합니다.
+    fit_input이 정수이면 이 단계 입력 대신 stages[fit_input]의 입력으로 통계를 구합니다.
+    """
+    halo = 0
+    needs_fit = False
+    fit_input = None
+
+    def fit(self, blocks):
+        pass
+
+    def apply(self, data, first, total):
+        return data
+
+
+class AlignStage(Stage):
+    """
+    processing.align_volume(alignSignal, alignGround, alignChannel)의 블록 처리 단계.
+    fit에서 지표면 탐지용 평균과 alignChannel 채움값을 원본 데이터 한 번의 스트리밍으로 함께 구합니다.
+    """
+    needs_fit = True
+
+    def __init__(self, ch, ch_offsets, distance_interval, depth=256, pad=10, dtype=np.float32):
+        self.ch = ch
+        self.depth = depth
+        self.pad = pad
+        self.dtype = dtype
+        self.shifts = channel_shifts(ch_offsets, distance_interval)
+        self.halo = max(self.shifts)
+
+    def fit(self, blocks):
+        ground_acc = TraceMean()
+        fill_accs = [TraceMean() for _ in self.shifts]
+        start = 0
+        for block in blocks:
+            stop = start + block.shape[2]
+            ground_acc.add(block[:self.ch, :self.depth, :])
+            for ch_idx, shift_px in enumerate(self.shifts):
+                # 채움값은 이동 후 남는 구간, 즉 입력의 [0, total - shift_px) 평균
+                end = min(stop, self.total - shift_px) - start
+                if shift_px and end > 0:
+                    fill_accs[ch_idx].add(block[ch_idx, :, :end])
+            start = stop
+        self.detection = ground_detection(ground_acc.mean())
+        self.fill_means = [acc.mean() if shift_px and shift_px < self.total else None
+                           for acc, shift_px in zip(fill_accs, self.shifts)]
+
+    def apply(self, data, first, total):
+        return fuse_align(data, self.detection, self.shifts, self.fill_means,
+                          self.depth, self.pad, self.dtype, first)
+
+
+class FilterStage(Stage):
+    """ filter.FilterPlan의 FilterStep 하나의 블록 처리 단계 (workers: 채널 묶음 스레드 수) """
+    def __init__(self, step, workers=1):
+        if step.base == 'kalman' and int(step.params['axis_para']) == 2:
+            raise ValueError("트레이스 축(axis=2) 칼만 필터는 블록 단위로 처리할 수 없습니다.")
+        self.step = step
+        self.workers = workers
+        self.halo = step.halo
+        self.needs_fit = step.fit is not None
+        self.stats = None
+
+    def fit(self, blocks):
+        self.stats = self.step.fit(blocks)
+
+    def apply(self, data, first, total):
+        # 앞 단계가 새로 만든 블록이면 제자리 계산이 가능한 필터는 블록에 그대로 씀
+        out = None
+        if self.step.inplace and data.dtype == self.step.dtype and data.flags.owndata and data.flags.writeable:
+            out = data
+        return self.step(data, self.stats, first, total, out, self.workers)
+
+
+def stream_process(volume, stages, block_size=4096):
+    """
+    stages를 블록 단위로 적용한 결과를 본 구간 순서대로 돌려주는 제너레이터.
+
+    통계가 필요한 단계는 그 앞 단계까지를 한 번 스트리밍하여 먼저 fit하고,
+    블록마다 모든 단계를 halo가 붙은 채로 적용한 뒤 마지막에 halo를 잘라냅니다.
+
+    :param volume: (채널, 깊이, 트레이스) 형태의 3차원 배열
+    :type volume: numpy.ndarray
+    :param stages: 순서대로 적용할 Stage 리스트
+    :type stages: list[Stage]
+    :param block_size: 블록 하나의 본 구간 트레이스 수
+    :type block_size: int
+    :return: (채널, 깊이, 블록 트레이스 수) 배열 제너레이터
+    :rtype: Iterator[numpy.ndarray]
+    """
+    total = volume.shape[2]
+    for k, stage in enumerate(stages):
+        stage.total = total
+        if stage.needs_fit:
+            src = k if stage.fit_input is None else stage.fit_input
+            stage.fit(_run_stages(volume, stages[:src], block_size))
+
+    yield from _run_stages(volume, stages, block_size)
+
+
+def _run_stages(volume, stages, block_size):
+    total = volume.shape[2]
+    halo = sum(stage.halo for stage in stages)
+    for block in iter_trace_blocks(volume, block_size, halo):
+        data = block.data
+        first = block.start - block.lead
+        for stage in stages:
+            data = stage.apply(data, first, total)
+        yield trim_halo(block._replace(data=data))
+
+
+def rd3_process_stream(DIRNAME, BASENAME, block_size=4096, group=None, dtype=np.int16, workers=None):
+    """
+    rd3_process와 같은 처리(align_volume, apply_filter)를
+    트레이스 블록 단위로 수행하여 결과 블록을 순서대로 돌려주는 제너레이터.
+    블록을 이어 붙이면 rd3_process 결과와 같습니다.
+
+    :param DIRNAME: .rd3/.rad 파일이 있는 디렉토리 경로
+    :type DIRNAME: str
+    :param BASENAME: .rd3 파일명
+    :type BASENAME: str
+    :param block_size: 블록 하나의 트레이스 수
+    :type block_size: int
+    :param group: 적용할 filter_group 이름 (기본값: default == 1인 필터)
+    :type group: str
+    :param dtype: 결과 블록 dtype (기본값: int16)
+    :type dtype: numpy.dtype
+    :param workers: 필터를 채널 묶음으로 나누어 처리할 스레드 수 (기본값: CPU 수)
+    :type workers: int
+    :return: (채널, 깊이, 블록 트레이스 수) 형태의 배열 제너레이터
+    :rtype: Iterator[numpy.ndarray]
+    """
+    chOffsets, distance_interval, ch = extractionRad(DIRNAME, BASENAME)
+    volume = openRd3(DIRNAME, BASENAME)
+
+    stages = [AlignStage(ch, chOffsets, distance_interval)]
+    filter_start = len(stages)
+    for step in load_filter_plan(group):
+        stage = FilterStage(step, workers or os.cpu_count() or 1)
+        if step.fit_source:
+            # ch_bias는 필터 적용 전 데이터의 평균을 기준으로 함
+            stage.fit_input = filter_start
+        stages.append(stage)
+
+    for block in stream_process(volume, stages, block_size):
+        yield block.astype(dtype)
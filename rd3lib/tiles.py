@@ -0,0 +1,157 @@
+'''
+측선 전체 Deep Zoom 타일 피라미드 출력 모듈
+종단면, 평단면, 도로면 영상을 측선 전체 길이로 만든 뒤 원본 해상도(트레이스당 1픽셀)부터 1x1 픽셀까지
+절반씩 줄인 단계(level)마다 TILE_SIZE 타일로 저장함
+
+타일 형식은 encoder로 정함 (rd3lib.encoders 참고, 기본값: PNG)
+Deep Zoom(.dzi) 형식이므로 OpenSeadragon 같은 뷰어가 현재 확대 단계에서 보이는 타일만 읽음
+    results/tiles/{name}_종단면.dzi
+    results/tiles/{name}_종단면_files/{level}/{col}_{row}.png
+'''
+
+import math
+import os
+from xml.etree import ElementTree
+
+import numpy as np
+from PIL import Image
+
+from rd3lib.encoders import get_encoder
+from rd3lib.instrument import stage
+from rd3lib.utils import _stretch_lut, normalize_minmax
+
+TILE_SIZE = 256
+DZI_NAMESPACE = "http://schemas.microsoft.com/deepzoom/2008"
+
+
+def level_sizes(width, height):
+    """
+    Deep Zoom 단계별 이미지 크기. 0단계는 1x1 픽셀이고 마지막 단계가 원본 크기입니다.
+
+    :rtype: list[tuple[int, int]]
+    """
+    max_level = math.ceil(math.log2(max(width, height, 1)))
+    return [(math.ceil(width / 2 ** (max_level - level)), math.ceil(height / 2 ** (max_level - level)))
+            for level in range(max_level + 1)]
+
+
+def write_tile_pyramid(image, savepath, name, tile_size=TILE_SIZE, encoder=None):
+    """
+    이미지를 Deep Zoom 타일 피라미드로 저장합니다.
+    원본 크기부터 2x2 평균(PIL Image.reduce)으로 절반씩 줄여 가며 단계마다 tile_size 타일로 자릅니다.
+
+    :param image: 저장할 이미지 (uint8 배열 또는 PIL 이미지)
+    :type image: numpy.ndarray or PIL.Image.Image
+    :param savepath: 저장 경로 (폴더)
+    :type savepath: str
+    :param name: .dzi 파일 이름 (확장자 제외)
+    :type name: str
+    :param tile_size: 타일 한 변의 픽셀 수
+    :type tile_size: int
+    :param encoder: 타일 인코더 또는 프리셋 이름 (rd3lib.encoders 참고, 기본값: 'png')
+    :type encoder: str or rd3lib.encoders.ImageEncoder
+    :return: 저장한 .dzi 파일 경로
+    :rtype: str
+    """
+    if tile_size < 1:
+        raise ValueError(f"tile_size는 1 이상이어야 합니다: {tile_size}")
+    encoder = get_encoder(encoder)
+    if not isinstance(image, Image.Image):
+        image = Image.fromarray(np.ascontiguousarray(image))
+
+    width, height = image.size
+    sizes = level_sizes(width, height)
+    files = os.path.join(savepath, f"{name}_files")
+    with stage('tiles', nbytes=width * height * len(image.getbands()), file=name, width=width, height=height,
+               encoder=encoder.name) as s:
+        count = 0
+        for level in range(len(sizes) - 1, -1, -1):
+            if image.size != sizes[level]:
+                image = image.reduce(2)
+            level_path = os.path.join(files, str(level))
+            os.makedirs(level_path, exist_ok=True)
+            level_width, level_height = sizes[level]
+            for col in range(math.ceil(level_width / tile_size)):
+                for row in range(math.ceil(level_height / tile_size)):
+                    box = (col * tile_size, row * tile_size,
+                           min((col + 1) * tile_size, level_width), min((row + 1) * tile_size, level_height))
+                    encoder.save(image.crop(box), os.path.join(level_path, f"{col}_{row}.{encoder.extension}"))
+                    count += 1
+        s.extra['tile_count'] = count
+
+        root = ElementTree.Element('Image', xmlns=DZI_NAMESPACE, Format=encoder.extension, Overlap='0',
+                                   TileSize=str(tile_size))
+        ElementTree.SubElement(root, 'Size', Width=str(width), Height=str(height))
+        dzi_path = os.path.join(savepath, f"{name}.dzi")
+        ElementTree.ElementTree(root).write(dzi_path, encoding='utf-8', xml_declaration=True)
+    return dzi_path
+
+
+def read_dzi(path):
+    """
+    .dzi 파일의 (가로, 세로, 타일 크기)를 읽습니다.
+
+    :rtype: tuple[int, int, int]
+    """
+    root = ElementTree.parse(path).getroot()
+    size = root.find(f"{{{DZI_NAMESPACE}}}Size")
+    return int(size.get('Width')), int(size.get('Height')), int(root.get('TileSize'))
+
+
+def _stretch(data):
+    # render_slice와 같이 고정 범위로 정규화한 뒤 측선 전체의 최소/최대값으로 명암을 늘림
+    img = Image.fromarray(np.ascontiguousarray(normalize_minmax(data, vmin=-3000, vmax=3000)))
+    return img.point(_stretch_lut(*img.getextrema()))
+
+
+def survey_views(rd3, road_image=None, depth=30, channel=12, plan_rows=8):
+    """
+    측선 전체의 종단면, 평단면, 도로면 영상을 만듭니다. (가로 한 픽셀이 트레이스 하나)
+
+    :param rd3: 전처리된 (채널, 깊이, 트레이스) 배열
+    :type rd3: numpy.ndarray
+    :param road_image: roadDrawing.makeImg 결과 (없으면 도로면 제외)
+    :type road_image: PIL.Image.Image
+    :param depth: 평단면 깊이 인덱스
+    :type depth: int
+    :param channel: 종단면 채널 인덱스
+    :type channel: int
+    :param plan_rows: 평단면에서 채널 하나를 표시할 픽셀 수 (채널 수가 적어 세로로 늘림)
+    :type plan_rows: int
+    :return: {'종단면': 이미지, '평단면': 이미지, '도로면': 이미지}
+    :rtype: dict
+    """
+    if rd3.ndim != 3:
+        raise ValueError("입력 데이터는 반드시 3차원이어야 합니다.")
+    views = {
+        '종단면': _stretch(rd3[channel, :, :]),
+        '평단면': _stretch(np.repeat(rd3[:, depth, :], plan_rows, axis=0)),
+    }
+    if road_image is not None:
+        views['도로면'] = road_image
+    return views
+
+
+def save_survey_tiles(rd3, filename, road_image=None, savepath="./results/tiles", depth=30, channel=12,
+                      tile_size=TILE_SIZE, encoder=None):
+    """
+    측선 전체의 종단면, 평단면, 도로면 영상을 Deep Zoom 타일 피라미드로 저장합니다.
+    200m 구간 PNG(image_save)와 달리 원본 해상도로 한 번만 저장하며 확대하지 않습니다.
+
+    :param rd3: 전처리된 (채널, 깊이, 트레이스) 배열
+    :type rd3: numpy.ndarray
+    :param filename: .rd3 파일명 (타일 파일 이름에 사용)
+    :type filename: str
+    :param road_image: roadDrawing.makeImg 결과 (없으면 도로면 제외)
+    :type road_image: PIL.Image.Image
+    :param savepath: 저장 경로 (폴더, 기본값: ./results/tiles)
+    :type savepath: str
+    :param encoder: 타일 인코더 또는 프리셋 이름 (rd3lib.encoders 참고, 기본값: 'png')
+    :type encoder: str or rd3lib.encoders.ImageEncoder
+    :return: {보기 이름: .dzi 파일 경로}
+    :rtype: dict
+    """
+    name = filename.split('.')[0]
+    os.makedirs(savepath, exist_ok=True)
+    return {view: write_tile_pyramid(image, savepath, f"{name}_{view}", tile_size, encoder)
+            for view, image in survey_views(rd3, road_image, depth, channel).items()}
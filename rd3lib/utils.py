@@ -1,3 +1,4 @@
+import functools
 import numpy as np
 from PIL import Image
 
@@ -17,23 +18,178 @@ def upscale_image(data_uint8, scale=4):
     new_size = (img.width * scale, img.height * scale)
     return img.resize(new_size, resample=Image.LANCZOS)
 
-def normalize_minmax(data, vmin=-3000, vmax=3000):
+def _normalize_float(data, vmin, vmax, gamma=1.0):
+    # 클리핑 → [0, 1] → gamma → 0~255 (uint8로 버림)
+    data_clipped = np.clip(data, vmin, vmax)
+    norm = ((data_clipped - vmin) / (vmax - vmin))
+    if gamma != 1.0:
+        norm = norm ** gamma
+    return (norm * 255).astype(np.uint8)
+
+def colormap_table(colormap):
+    """
+    colormap을 256단계 RGB 변환표로 반환합니다.
+
+    :param colormap: 'gray', matplotlib colormap 이름(사용할 때 matplotlib를 import함),
+                     또는 (N, 3) 배열 (0~1 실수 또는 0~255 정수, 256단계로 보간)
+    :type colormap: str or numpy.ndarray
+    :return: (256, 3) uint8 배열
+    :rtype: numpy.ndarray
+    """
+    if isinstance(colormap, str):
+        if colormap == 'gray':
+            return np.repeat(np.arange(256, dtype=np.uint8)[:, None], 3, axis=1)
+        import matplotlib
+        colors = matplotlib.colormaps[colormap](np.linspace(0, 1, 256))[:, :3] * 255
+        return np.round(colors).astype(np.uint8)
+
+    colors = np.asarray(colormap)
+    if colors.ndim != 2 or colors.shape[1] != 3:
+        raise ValueError("colormap 배열은 (N, 3) 형태여야 합니다.")
+    if colors.dtype.kind == 'f':
+        colors = colors * 255
+    position = np.linspace(0, len(colors) - 1, 256)
+    channels = [np.interp(position, np.arange(len(colors)), colors[:, k]) for k in range(3)]
+    return np.clip(np.round(np.stack(channels, axis=1)), 0, 255).astype(np.uint8)
+
+@functools.lru_cache(maxsize=64)
+def _amplitude_lut(vmin, vmax, gamma, colormap):
+    # int16 값을 uint16으로 본 인덱스 순서 (0~32767, -32768~-1)
+    values = np.arange(1 << 16, dtype=np.uint16).view(np.int16)
+    lut = _normalize_float(values, vmin, vmax, gamma)
+    if colormap is not None:
+        lut = colormap_table(np.array(colormap, dtype=np.uint8) if isinstance(colormap, tuple) else colormap)[lut]
+    lut.setflags(write=False)
+    return lut
+
+def amplitude_lut(vmin=-3000, vmax=3000, gamma=1.0, colormap=None):
     """
-    입력된 2차원 배열 데이터를 지정한 최소/최대값 기준으로 클리핑한 뒤,
+    int16 진폭을 uint8 밝기(또는 RGB)로 바꾸는 65,536칸 변환표를 반환합니다.
+    (vmin, vmax, gamma, colormap)별로 캐시되며, int16 배열을 uint16으로 본 값이 인덱스입니다. (apply_lut 참고)
+
+    값은 normalize_minmax의 실수 계산과 같습니다.
+
+    :param vmin: 정규화할 하한값
+    :type vmin: int
+    :param vmax: 정규화할 상한값
+    :type vmax: int
+    :param gamma: 정규화한 [0, 1] 값에 적용할 감마
+    :type gamma: float
+    :param colormap: None이면 밝기, 아니면 RGB (colormap_table 참고)
+    :type colormap: str or numpy.ndarray
+    :return: 읽기 전용 (65536,) 또는 (65536, 3) uint8 배열
+    :rtype: numpy.ndarray
+    """
+    if colormap is not None and not isinstance(colormap, str):
+        colormap = tuple(map(tuple, colormap_table(colormap)))
+    return _amplitude_lut(vmin, vmax, float(gamma), colormap)
+
+_LUT_BLOCK = 1 << 16  # np.take가 인덱스를 intp로 바꾸는 임시 배열이 캐시에 들어가도록 나누는 원소 수
+
+def _take_blocks(lut, index, out):
+    if index.size <= _LUT_BLOCK:
+        # uint16 인덱스는 변환표 범위를 벗어나지 않으므로 mode='clip'으로 출력 버퍼링을 피함
+        np.take(lut, index, axis=0, out=out, mode='clip')
+        return
+    step = max(_LUT_BLOCK // index[0].size, 1) if index.ndim > 1 else _LUT_BLOCK
+    for i in range(0, len(index), step):
+        if step == 1 and index.ndim > 1 and index[i].size > _LUT_BLOCK:
+            _take_blocks(lut, index[i], out[i])
+        else:
+            np.take(lut, index[i:i + step], axis=0, out=out[i:i + step], mode='clip')
+
+def apply_lut(data, lut, out=None):
+    """
+    int16 배열에 amplitude_lut 변환표를 np.take로 적용합니다.
+    데이터를 _LUT_BLOCK 원소 단위로 나누어 한 번씩만 읽고 쓰므로 큰 임시 배열을 만들지 않습니다.
+
+    :param data: int16 배열 (슬라이스, 슬라이스 묶음, 볼륨 모두 가능)
+    :type data: numpy.ndarray
+    :param lut: amplitude_lut 결과
+    :type lut: numpy.ndarray
+    :param out: 결과를 저장할 uint8 배열 (shape = data.shape + lut.shape[1:])
+    :type out: numpy.ndarray
+    :return: uint8 배열
+    :rtype: numpy.ndarray
+    """
+    data = np.asarray(data)
+    if data.dtype != np.int16:
+        raise ValueError(f"apply_lut은 int16 배열만 사용할 수 있습니다: {data.dtype}")
+    if out is None:
+        out = np.empty(data.shape + lut.shape[1:], dtype=np.uint8)
+    _take_blocks(lut, data.view(np.uint16), out)
+    return out
+
+def normalize_minmax(data, vmin=-3000, vmax=3000, gamma=1.0, colormap=None, out=None):
+    """
+    입력된 배열 데이터를 지정한 최소/최대값 기준으로 클리핑한 뒤,
     0부터 255 사이의 범위로 정규화하여 uint8 타입의 이미지 데이터로 반환합니다.
 
-    :param data: 정규화할 2차원 NumPy 배열 (예: RD3 슬라이스)
+    int16 배열은 캐시된 65,536칸 변환표(amplitude_lut)를 np.take로 한 번에 적용하므로
+    실수 임시 배열을 만들지 않으며, 볼륨이나 슬라이스 묶음도 한 번에 변환할 수 있습니다.
+    colormap을 지정하면 마지막 축에 RGB가 추가된 uint8[..., 3] 배열을 반환합니다.
+
+    :param data: 정규화할 NumPy 배열 (예: RD3 슬라이스)
     :type data: numpy.ndarray
     :param vmin: 정규화할 하한값 (기본값: -3000)
     :type vmin: int
     :param vmax: 정규화할 상한값 (기본값: 3000)
     :type vmax: int
-    :return: 0~255 범위로 정규화된 uint8 형식의 2차원 배열
+    :param gamma: 정규화한 [0, 1] 값에 적용할 감마 (기본값: 1.0)
+    :type gamma: float
+    :param colormap: RGB로 바꿀 colormap (colormap_table 참고, 기본값: None)
+    :type colormap: str or numpy.ndarray
+    :param out: 결과를 저장할 uint8 배열
+    :type out: numpy.ndarray
+    :return: 0~255 범위로 정규화된 uint8 형식의 배열
     :rtype: numpy.ndarray
     """
-    data_clipped = np.clip(data, vmin, vmax)
-    norm = ((data_clipped - vmin) / (vmax - vmin)) * 255
-    return norm.astype(np.uint8)
+    data = np.asarray(data)
+    if data.dtype == np.int16:
+        return apply_lut(data, amplitude_lut(vmin, vmax, gamma, colormap), out)
+
+    result = _normalize_float(data, vmin, vmax, gamma)
+    if colormap is not None:
+        result = colormap_table(colormap)[result]
+    if out is None:
+        return result
+    out[...] = result
+    return out
+
+def _stretch_lut(lo, hi):
+    # matplotlib imshow의 자동 명암(Normalize(lo, hi) + 256단계 gray colormap)과 같은 uint8 변환표
+    if hi <= lo:
+        return [0] * 256
+    levels = np.floor((np.arange(256) - lo) / (hi - lo) * 256)
+    return np.clip(levels, 0, 255).astype(np.uint8).tolist()
+
+def render_slice(slice_data, size, vmin=-3000, vmax=3000, colormap=None):
+    """
+    2차원 슬라이스를 size 크기의 grayscale(또는 RGB) PIL 이미지로 만듭니다.
+
+    normalize_minmax로 uint8로 바꾼 뒤 LANCZOS로 한 번에 size로 크기를 바꾸고,
+    matplotlib imshow와 같이 이미지의 최소/최대값이 0/255가 되도록 명암을 늘립니다.
+    colormap을 지정하면 늘린 밝기에 colormap_table을 적용한 RGB 이미지를 반환합니다.
+
+    :param slice_data: 2차원 NumPy 배열 (예: RD3 슬라이스)
+    :type slice_data: numpy.ndarray
+    :param size: 결과 이미지 크기 (가로, 세로) 픽셀
+    :type size: tuple[int, int]
+    :param vmin: 정규화할 하한값 (기본값: -3000)
+    :type vmin: int
+    :param vmax: 정규화할 상한값 (기본값: 3000)
+    :type vmax: int
+    :param colormap: RGB로 바꿀 colormap (colormap_table 참고, 기본값: None)
+    :type colormap: str or numpy.ndarray
+    :return: grayscale(L) 또는 RGB PIL 이미지
+    :rtype: PIL.Image.Image
+    """
+    img = Image.fromarray(np.ascontiguousarray(normalize_minmax(slice_data, vmin, vmax)))
+    img = img.resize(size, resample=Image.LANCZOS)
+    img = img.point(_stretch_lut(*img.getextrema()))
+    if colormap is None:
+        return img
+    return Image.fromarray(colormap_table(colormap)[np.asarray(img)], 'RGB')
 
 def chunk_range(datalength, distance_interval):
     chunk_list = []
@@ -49,14 +205,140 @@ def chunk_range(datalength, distance_interval):
 
     return chunk_list
 
-def rd3_process(DIRNAME, BASENAME):
-    from rd3lib import readRd3, extractionRad, reshapeRd3, apply_filter, alignSignal, alignGround, alignChannel
+def rd3_process(DIRNAME, BASENAME, group=None, dtype=np.int16, cache=None, out=None):
+    """
+    RD3 파일을 읽어 정렬(align_volume)과 필터(apply_filter)를 적용합니다.
+
+    cache가 있으면 원본 데이터 해시와 정렬 설정을 키로 정렬 결과를, 그 뒤로 필터별 결과를 캐시하므로
+    같은 파일에서 뒤쪽 필터 설정만 바꾸어 다시 호출하면 바뀐 필터부터만 다시 계산합니다.
+
+    :param DIRNAME: .rd3/.rad 파일이 있는 디렉토리 경로
+    :type DIRNAME: str
+    :param BASENAME: .rd3 파일명
+    :type BASENAME: str
+    :param group: 적용할 filter_group 이름 (기본값: default == 1인 필터)
+    :type group: str
+    :param dtype: 결과 dtype (기본값: int16)
+    :type dtype: numpy.dtype
+    :param cache: 중간 결과 캐시
+    :type cache: rd3lib.filter_cache.FilterCache
+    :param out: 결과를 저장할 (채널, 깊이, 트레이스) 배열 (예: SharedArray.array, 있으면 out의 dtype 사용)
+    :type out: numpy.ndarray
+    :return: 전처리된 (채널, 깊이, 트레이스) 배열
+    :rtype: numpy.ndarray
+    """
+    from rd3lib import openRd3, extractionRad, apply_filter, align_volume
+    from rd3lib.filter_cache import content_key, chain_key
+    chOffsets, distance_interval, ch = extractionRad(DIRNAME, BASENAME)
+    rd3 = openRd3(DIRNAME, BASENAME)
+
+    aligned, key = None, None
+    if cache is not None:
+        key = chain_key(content_key(rd3), ('align', ch, tuple(chOffsets), distance_interval, 'float32'))
+        aligned = cache.get(key)
+    if aligned is None:
+        aligned = align_volume(rd3, ch, chOffsets, distance_interval, dtype=np.float32)
+        if cache is not None:
+            cache.put(key, aligned)
+        # 정렬 결과는 여기서만 쓰므로 필터의 작업 버퍼로 덮어써도 됨
+        return apply_filter(aligned, group, dtype, out, overwrite_input=True, cache=cache, source_key=key)
+
+    return apply_filter(aligned, group, dtype, out, cache=cache, source_key=key)
+
+def rd3_process_presets(DIRNAME, BASENAME, groups, dtype=np.int16, workers=None):
+    """
+    RD3 파일을 읽어 정렬(align_volume)한 뒤 여러 필터 그룹을 한 번에 적용합니다.
+    그룹들의 앞쪽에 같은 필터가 있으면 한 번만 계산합니다. (apply_filters 참고)
+
+    :param DIRNAME: .rd3/.rad 파일이 있는 디렉토리 경로
+    :type DIRNAME: str
+    :param BASENAME: .rd3 파일명
+    :type BASENAME: str
+    :param groups: 적용할 filter_group 이름들
+    :type groups: iterable[str]
+    :param dtype: 결과 dtype (기본값: int16)
+    :type dtype: numpy.dtype
+    :param workers: 채널 묶음을 나누어 처리할 스레드 수 (기본값: CPU 수)
+    :type workers: int
+    :return: {group: 전처리된 (채널, 깊이, 트레이스) 배열}
+    :rtype: dict
+    """
+    from rd3lib import openRd3, extractionRad, apply_filters, align_volume
     chOffsets, distance_interval, ch = extractionRad(DIRNAME, BASENAME)
-    rd3 = readRd3(DIRNAME, BASENAME)
-    rd3 = reshapeRd3(rd3)
-    rd3 = alignSignal(rd3, ch)
-    rd3 = alignGround(rd3, ch)
-    rd3 = alignChannel(rd3, chOffsets, distance_interval)
-    rd3 = apply_filter(rd3)
-
-    return rd3
\ No newline at end of file
+    rd3 = openRd3(DIRNAME, BASENAME)
+    rd3 = align_volume(rd3, ch, chOffsets, distance_interval, dtype=np.float32)
+    return apply_filters(rd3, groups, dtype, overwrite_input=True, workers=workers)
+
+TRACE_CHUNK = 1024
+
+
+class TraceMean:
+    """
+    트레이스(마지막) 축 방향 평균을 블록 단위로 누적하는 클래스.
+
+    합계는 항상 전역 트레이스 인덱스 기준 TRACE_CHUNK 구간마다 계산한 뒤 순서대로 더하므로,
+    데이터를 한 번에 넣든 여러 블록으로 나누어 넣든 결과가 비트 단위로 같습니다.
+    add()에는 반드시 연속된 트레이스 블록을 순서대로 넣어야 합니다.
+
+    :param dtype: 합계를 누적할 dtype (기본값: float64)
+    :type dtype: numpy.dtype
+    """
+    def __init__(self, dtype=np.float64):
+        self.dtype = dtype
+        self.total = None
+        self.count = 0
+        self._pending = []
+        self._pending_len = 0
+
+    def add(self, data):
+        """
+        연속된 트레이스 블록을 누적합니다.
+
+        :param data: (..., 트레이스 수) 형태의 배열
+        :type data: numpy.ndarray
+        """
+        n = data.shape[-1]
+        pos = 0
+        while pos < n:
+            take = min(TRACE_CHUNK - self._pending_len, n - pos)
+            self._pending.append(data[..., pos:pos + take])
+            self._pending_len += take
+            pos += take
+            if self._pending_len == TRACE_CHUNK:
+                self._flush()
+        self.count += n
+        return self
+
+    def _flush(self):
+        if not self._pending:
+            return
+        if len(self._pending) == 1:
+            chunk = np.ascontiguousarray(self._pending[0])
+        else:
+            chunk = np.concatenate(self._pending, axis=-1)
+        chunk_sum = chunk.sum(axis=-1, dtype=self.dtype)
+        self.total = chunk_sum if self.total is None else self.total + chunk_sum
+        self._pending = []
+        self._pending_len = 0
+
+    def mean(self):
+        """
+        지금까지 누적한 트레이스의 평균을 반환합니다.
+
+        :return: 트레이스 축이 제거된 평균 배열
+        :rtype: numpy.ndarray
+        """
+        self._flush()
+        return self.total / self.count
+
+
+def trace_mean(data):
+    """
+    TraceMean을 이용해 배열 전체의 트레이스 축 평균을 계산합니다.
+
+    :param data: (..., 트레이스 수) 형태의 배열
+    :type data: numpy.ndarray
+    :return: 트레이스 축이 제거된 평균 배열
+    :rtype: numpy.ndarray
+    """
+    return TraceMean().add(data).mean()
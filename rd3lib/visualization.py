@@ -1,7 +1,6 @@
 '''
 이미지/그래프 그리기 함수들
 '''
-import matplotlib.pyplot as plt
 
 def plot_gpr_image(rd3_cut, channel, cmap='gray'):
     """
@@ -19,6 +18,9 @@ def plot_gpr_image(rd3_cut, channel, cmap='gray'):
     :return: 없음 (이미지 출력만 수행)
     :rtype: None
     """
+    # rd3lib를 import할 때 matplotlib를 불러오지 않도록 사용할 때 import
+    import matplotlib.pyplot as plt
+
     plt.figure(figsize=(12, 6))
     plt.imshow(rd3_cut[channel], aspect='auto', cmap=cmap)
     plt.title(f"GPR img")
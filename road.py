@@ -1,8 +1,11 @@
 import bitstring
 from PIL import Image
 import numpy as np
+import logging
 import os
 
+logger = logging.getLogger(__name__)
+
 
 class roadDrawing():
 
@@ -22,7 +25,7 @@ class roadDrawing():
 
         dataSize = len(data)
 
-        print("mkeImage", dataSize/3/file_langth)
+        logger.debug("mkeImage %s", dataSize/3/file_langth)
 
         if dataSize/3/file_langth > 1270 and dataSize/3/file_langth < 1285:
             Hsize = 1280
@@ -43,7 +46,7 @@ class roadDrawing():
 
         imageSize = int(weithSize * heigthSize)
 
-        print('realHeigthSize',realHeigthSize ,'\n','realWeithSize',realWeithSize)
+        logger.debug('realHeigthSize %s realWeithSize %s', realHeigthSize, realWeithSize)
 
         t = ['uint:24']
         ii = np.zeros(imageSize)
@@ -58,16 +61,16 @@ class roadDrawing():
         ii = aa.unpack(','.join(t * self.byteLen * imageSize))
 
         b = np.reshape(ii[(len(ii) % int(heigthSize)):], (-1, int(heigthSize)))
-        print(b.shape)
+        logger.debug('%s', b.shape)
 
         c = b / b.max() * 255
-        print(c.shape)
+        logger.debug('%s', c.shape)
 
         img = Image.fromarray(c[::-1])
         if img.mode != 'RGB':
             img = img.convert('RGB')
 
         deg_image = img.transpose(Image.ROTATE_270)
-        print(deg_image.size[0])
+        logger.debug('%s', deg_image.size[0])
 
         return deg_image
\ No newline at end of file
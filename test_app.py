@@ -1,7 +1,7 @@
 import os
 import pytest
 from fastapi.testclient import TestClient
-from main import app, clear_directories, RESULT_DIR
+from main import app, clear_directories, RESULT_DIR, TILE_DIR
 from io import BytesIO
 
 client = TestClient(app)
@@ -21,6 +21,22 @@ def test_upload_with_wrong_extension():
     assert "rd3, rad, rst 파일만 사용할 수 있습니다." in response.text
 
 
+def test_tile_sources_and_clear():
+    # Deep Zoom 타일 목록은 도로, 평단, 종단 순서이고 clear_directories가 타일 폴더까지 지움
+    import numpy as np
+    from rd3lib.tiles import write_tile_pyramid
+    for view in ["종단면", "도로면"]:
+        write_tile_pyramid(np.zeros((64, 300), dtype=np.uint8), TILE_DIR, f"test_{view}")
+
+    response = client.get("/tile-sources")
+    assert [(t["view"], t["width"], t["height"]) for t in response.json()] == [("도로면", 300, 64), ("종단면", 300, 64)]
+    tile = client.get(response.json()[0]["url"].replace(".dzi", "_files/9/1_0.png"))
+    assert tile.status_code == 200 and tile.headers["content-type"] == "image/png"
+
+    clear_directories()
+    assert os.listdir(TILE_DIR) == []
+
+
 def test_full_process_success():
     # 실제 test_uploads 디렉토리에 있는 파일을 읽어서 업로드
     upload_dir = "test_uploads"